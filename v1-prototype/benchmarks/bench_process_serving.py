@@ -0,0 +1,171 @@
+"""Throughput and per-worker memory of ProcessPoolQA vs thread-based serving.
+
+Uses the bundled PDFs with synthetic embeddings and a fake LLM that holds the
+GIL for a fixed amount of CPU time per answer, so no AWS access is needed.
+
+Run from v1-prototype/:
+    python benchmarks/bench_process_serving.py --workers 1 2 4 --replicate 20
+"""
+
+import argparse
+import functools
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import faiss
+import numpy as np
+import process_serving
+from data_ingestion import DocumentLoader
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from process_serving import ProcessPoolQA, export_shared_index
+
+DIM = 1536
+
+
+class HashEmbeddings:
+    def embed_query(self, text):
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        return rng.standard_normal(DIM).astype(np.float32).tolist()
+
+
+class CPUBoundLLM:
+    """Stands in for response handling that burns `cpu_ms` of CPU under the GIL.
+
+    The deadline is measured in thread CPU time, so time spent waiting for the
+    GIL does not count and every call does the same amount of work.
+    """
+
+    def __init__(self, cpu_ms: float):
+        self.cpu_ms = cpu_ms
+
+    def invoke(self, prompt):
+        deadline = time.thread_time() + self.cpu_ms / 1000
+        words = prompt.split()
+        counts = {}
+        while time.thread_time() < deadline:
+            for word in words[:200]:
+                counts[word] = counts.get(word, 0) + 1
+        return SimpleNamespace(content=f"Answer based on {len(words)} prompt words")
+
+
+def fake_models(cpu_ms: float):
+    return HashEmbeddings(), CPUBoundLLM(cpu_ms)
+
+
+def build_index(index_dir: str, data_path: str, replicate: int):
+    chunks = DocumentLoader(data_path=data_path).load_and_split()
+    chunks = chunks * replicate
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(DIM)
+    for start in range(0, len(chunks), 4096):
+        batch = min(4096, len(chunks) - start)
+        index.add(rng.standard_normal((batch, DIM)).astype(np.float32))
+
+    ids = [str(i) for i in range(len(chunks))]
+    vectorstore = FAISS(
+        embedding_function=HashEmbeddings().embed_query,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(ids, chunks))),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
+    export_shared_index(vectorstore, index_dir)
+    return index.ntotal * DIM * 4
+
+
+def memory_mb(pid: int):
+    """Return (RSS, PSS, private) in MB from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), private
+
+
+def run_threads(index_dir, questions, workers, cpu_ms):
+    process_serving._init_worker(
+        index_dir, 3, True, functools.partial(fake_models, cpu_ms)
+    )
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(process_serving._answer, questions))
+    return time.perf_counter() - start
+
+
+def run_processes(index_dir, questions, workers, cpu_ms, use_mmap):
+    with ProcessPoolQA(
+        index_dir,
+        num_workers=workers,
+        use_mmap=use_mmap,
+        model_factory=functools.partial(fake_models, cpu_ms),
+    ) as pool:
+        pool.batch_ask(questions[: workers * 2])  # warm up every worker
+
+        start = time.perf_counter()
+        pool.batch_ask(questions)
+        elapsed = time.perf_counter() - start
+
+        memory = [memory_mb(pid) for pid in pool.worker_pids()]
+    return elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-path", default="data/raw/")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--cpu-ms", type=float, default=20.0)
+    parser.add_argument("--replicate", type=int, default=20)
+    args = parser.parse_args()
+
+    questions = [f"Question {i} about battery products" for i in range(args.questions)]
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index_bytes = build_index(index_dir, args.data_path, args.replicate)
+
+        print(
+            f"\nIndex: {index_bytes / 1e6:.0f} MB of vectors | "
+            f"{args.questions} questions | {args.cpu_ms:.0f} ms CPU per answer | "
+            f"{os.cpu_count()} CPUs"
+        )
+        print("=" * 80)
+        print(
+            f"{'Mode':<18}{'Workers':>8}{'QPS':>10}"
+            f"{'RSS/worker':>14}{'PSS/worker':>14}{'Private':>12}"
+        )
+        print("-" * 80)
+
+        for workers in args.workers:
+            elapsed = run_threads(index_dir, questions, workers, args.cpu_ms)
+            print(f"{'threads':<18}{workers:>8}{args.questions / elapsed:>10.1f}")
+
+        for use_mmap in (True, False):
+            mode = "processes (mmap)" if use_mmap else "processes (copy)"
+            for workers in args.workers:
+                elapsed, memory = run_processes(
+                    index_dir, questions, workers, args.cpu_ms, use_mmap
+                )
+                rss, pss, private = (np.mean(m) for m in zip(*memory))
+                print(
+                    f"{mode:<18}{workers:>8}{args.questions / elapsed:>10.1f}"
+                    f"{rss:>11.0f} MB{pss:>11.0f} MB{private:>9.0f} MB"
+                )
+        print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
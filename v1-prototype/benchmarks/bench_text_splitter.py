@@ -0,0 +1,102 @@
+"""Compare OffsetTextSplitter with LangChain's RecursiveCharacterTextSplitter.
+
+Run from v1-prototype/:
+    python benchmarks/bench_text_splitter.py --data-path data/raw/
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from data_ingestion import DocumentLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from text_splitter import DEFAULT_SEPARATORS, OffsetTextSplitter
+
+
+def measure(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-path", default="data/raw/")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = DocumentLoader(data_path=args.data_path)._load_pdfs()
+    total_chars = sum(len(doc.page_content) for doc in documents)
+
+    langchain_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        separators=DEFAULT_SEPARATORS,
+        length_function=len,
+    )
+    offset_splitter = OffsetTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        separators=DEFAULT_SEPARATORS,
+    )
+
+    cases = [
+        (
+            "RecursiveCharacterTextSplitter",
+            lambda: langchain_splitter.split_documents(documents),
+        ),
+        (
+            "OffsetTextSplitter (offsets)",
+            lambda: offset_splitter.split_documents(documents),
+        ),
+        (
+            "OffsetTextSplitter (+ documents)",
+            lambda: offset_splitter.split_documents(documents).to_documents(),
+        ),
+    ]
+
+    print(
+        f"\n{len(documents)} pages, {total_chars:,} chars "
+        f"(chunk_size={args.chunk_size}, overlap={args.chunk_overlap}, best of {args.repeat})"
+    )
+    print("=" * 80)
+    print(f"{'Splitter':<36}{'Chunks':>8}{'Time (ms)':>14}{'Peak mem (MB)':>18}")
+    print("-" * 80)
+
+    outputs = {}
+    for name, fn in cases:
+        result, elapsed, peak = measure(fn, args.repeat)
+        outputs[name] = result
+        print(f"{name:<36}{len(result):>8}{elapsed * 1000:>14.1f}{peak / 1e6:>18.2f}")
+    print("=" * 80)
+
+    expected = [
+        (doc.page_content, doc.metadata)
+        for doc in outputs["RecursiveCharacterTextSplitter"]
+    ]
+    actual = [
+        (doc.page_content, doc.metadata)
+        for doc in outputs["OffsetTextSplitter (+ documents)"]
+    ]
+    print(f"Identical chunks: {'✅' if expected == actual else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
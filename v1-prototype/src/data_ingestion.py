@@ -6,7 +6,7 @@ from typing import List
 
 import fitz
 from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from text_splitter import ChunkedCorpus, OffsetTextSplitter
 
 
 @contextlib.contextmanager
@@ -73,31 +73,36 @@ class DocumentLoader:
         documents: List[Document],
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-    ) -> List[Document]:
-        """문서를 청크로 분할"""
+    ) -> ChunkedCorpus:
+        """문서를 청크 오프셋으로 분할"""
         print(
             f"Splitting documents (chunk_size={chunk_size}, overlap={chunk_overlap})..."
         )
 
-        text_splitter = RecursiveCharacterTextSplitter(
+        text_splitter = OffsetTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             separators=["\n\n", "\n", ". ", " ", ""],
-            length_function=len,
         )
 
-        chunks = text_splitter.split_documents(documents)
-        print(f"✅ Created {len(chunks)} chunks")
+        corpus = text_splitter.split_documents(documents)
+        print(f"✅ Created {len(corpus)} chunks")
 
-        return chunks
+        return corpus
+
+    def load_and_split_offsets(
+        self, chunk_size: int = 1000, chunk_overlap: int = 200
+    ) -> ChunkedCorpus:
+        """문서 로드 및 오프셋 기반 분할 (문자열은 필요할 때만 생성)"""
+        documents = self._load_pdfs()
+        return self._split_documents(documents, chunk_size, chunk_overlap)
 
     def load_and_split(
         self, chunk_size: int = 1000, chunk_overlap: int = 200
     ) -> List[Document]:
         """문서 로드 및 분할"""
-        documents = self._load_pdfs()
-        chunks = self._split_documents(documents, chunk_size, chunk_overlap)
-        return chunks
+        corpus = self.load_and_split_offsets(chunk_size, chunk_overlap)
+        return corpus.to_documents()
 
 
 if __name__ == "__main__":
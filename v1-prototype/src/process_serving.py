@@ -0,0 +1,272 @@
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from qa_pipeline import PROMPT_TEMPLATE, format_sources
+from sharded_index import ShardedVectorIndex
+
+INDEX_FILE = "index.faiss"
+TEXTS_FILE = "texts.bin"
+OFFSETS_FILE = "offsets.npy"
+METADATA_FILE = "metadata.json"
+
+
+def export_shared_index(vectorstore, index_dir: str) -> Path:
+    """Write a LangChain FAISS vectorstore as flat files workers can mmap.
+
+    Chunk texts are concatenated into one UTF-8 file addressed by byte
+    offsets, and each distinct metadata dict is stored once.
+    """
+    out = Path(index_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    texts = bytearray()
+    offsets = np.zeros((vectorstore.index.ntotal, 2), dtype=np.int64)
+    metadatas, metadata_ids, seen = [], [], {}
+
+    for row in range(vectorstore.index.ntotal):
+        doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[row])
+        encoded = doc.page_content.encode("utf-8")
+        offsets[row] = (len(texts), len(texts) + len(encoded))
+        texts.extend(encoded)
+
+        key = json.dumps(doc.metadata, sort_keys=True)
+        if key not in seen:
+            seen[key] = len(metadatas)
+            metadatas.append(doc.metadata)
+        metadata_ids.append(seen[key])
+
+    faiss.write_index(vectorstore.index, str(out / INDEX_FILE))
+    (out / TEXTS_FILE).write_bytes(bytes(texts))
+    np.save(out / OFFSETS_FILE, offsets)
+    (out / METADATA_FILE).write_text(
+        json.dumps({"metadatas": metadatas, "metadata_ids": metadata_ids})
+    )
+
+    print(f"✅ Shared index exported to {out} ({vectorstore.index.ntotal} vectors)")
+    return out
+
+
+class SharedIndex:
+    """Read-only view of an exported index backed by memory-mapped files.
+
+    Vectors and texts live in the OS page cache, so every process that opens
+    the same directory shares one physical copy.
+    """
+
+    def __init__(self, index_dir: str, use_mmap: bool = True):
+        path = Path(index_dir)
+
+        flags = faiss.IO_FLAG_READ_ONLY
+        if use_mmap:
+            if not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+                raise RuntimeError(
+                    f"faiss {faiss.__version__} cannot mmap indexes "
+                    "(needs faiss-cpu>=1.9.0); pass use_mmap=False to copy instead"
+                )
+            flags |= faiss.IO_FLAG_MMAP_IFC
+        self.index = faiss.read_index(str(path / INDEX_FILE), flags)
+
+        self._texts_file = open(path / TEXTS_FILE, "rb")
+        if use_mmap:
+            self.texts = mmap.mmap(
+                self._texts_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            self.offsets = np.load(path / OFFSETS_FILE, mmap_mode="r")
+        else:
+            self.texts = self._texts_file.read()
+            self.offsets = np.load(path / OFFSETS_FILE)
+
+        metadata = json.loads((path / METADATA_FILE).read_text())
+        self.metadatas = metadata["metadatas"]
+        self.metadata_ids = metadata["metadata_ids"]
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+    def document(self, row: int) -> Document:
+        start, end = self.offsets[row]
+        return Document(
+            page_content=self.texts[start:end].decode("utf-8"),
+            metadata=self.metadatas[self.metadata_ids[row]],
+        )
+
+    def search(self, vector: List[float], k: int = 3) -> List[Document]:
+        query = np.asarray([vector], dtype=np.float32)
+        _, rows = self.index.search(query, k)
+        return [self.document(int(row)) for row in rows[0] if row != -1]
+
+    def close(self):
+        if isinstance(self.texts, mmap.mmap):
+            self.texts.close()
+        self._texts_file.close()
+
+
+def bedrock_models() -> Tuple[object, object]:
+    """Create embeddings and LLM clients inside a worker process"""
+    from bedrock_client import BedrockClientManager
+
+    manager = BedrockClientManager()
+    return manager.get_embeddings(), manager.get_llm()
+
+
+_worker: Dict = {}
+
+
+def _init_worker(
+    index_dir: str,
+    k: int,
+    use_mmap: bool,
+    model_factory: Callable,
+    pid_queue=None,
+):
+    embeddings, llm = model_factory()
+    _worker.update(
+        index=SharedIndex(index_dir, use_mmap=use_mmap),
+        embeddings=embeddings,
+        llm=llm,
+        k=k,
+    )
+    if pid_queue is not None:
+        pid_queue.put(os.getpid())
+
+
+def _answer(question: str) -> Dict:
+    start_time = time.time()
+
+    vector = _worker["embeddings"].embed_query(question)
+    source_docs = _worker["index"].search(vector, k=_worker["k"])
+
+    context = "\n\n".join(doc.page_content for doc in source_docs)
+    prompt = PROMPT_TEMPLATE.format(context=context, question=question)
+    response = _worker["llm"].invoke(prompt)
+    answer = getattr(response, "content", response)
+
+    return {
+        "question": question,
+        "answer": answer,
+        "sources": format_sources(source_docs),
+        "elapsed_time": time.time() - start_time,
+        "worker_pid": os.getpid(),
+    }
+
+
+class ProcessPoolQA:
+    """Answer questions in parallel worker processes sharing one read-only index.
+
+    Each worker opens the exported index with mmap and creates its own
+    Bedrock clients, so retrieval, prompt assembly and response parsing run
+    outside the parent's GIL without copying the index per process.
+    """
+
+    def __init__(
+        self,
+        index_dir: str = "data/embeddings/battery_shared_index",
+        num_workers: int = 4,
+        k: int = 3,
+        use_mmap: bool = True,
+        model_factory: Callable = bedrock_models,
+        mp_context: Optional[str] = None,
+    ):
+        if not (Path(index_dir) / INDEX_FILE).exists():
+            raise ValueError(
+                f"Shared index not found at {index_dir}. "
+                "Call export_shared_index() first."
+            )
+
+        self.index_dir = index_dir
+        self.num_workers = num_workers
+        self.k = k
+
+        # Workers report their PID once initialized; see worker_pids()
+        context = multiprocessing.get_context(mp_context)
+        self._pid_queue = context.SimpleQueue()
+        self._pids: List[int] = []
+
+        print(f"Starting {num_workers} QA worker processes (index: {index_dir})...")
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(index_dir, k, use_mmap, model_factory, self._pid_queue),
+        )
+
+    @classmethod
+    def from_qa_system(
+        cls,
+        qa_system,
+        index_dir: str = "data/embeddings/battery_shared_index",
+        force_export: bool = False,
+        **kwargs,
+    ) -> "ProcessPoolQA":
+        """Export a BatteryQASystem vectorstore and start workers.
+
+        The export is reused only while it is newer than the saved vectorstore,
+        so a rebuilt vectorstore is exported again. Sharded vectorstores are
+        not supported.
+        """
+        if isinstance(qa_system.vectorstore, ShardedVectorIndex):
+            raise ValueError(
+                "ProcessPoolQA needs a single FAISS vectorstore; call "
+                "build_vectorstore() instead of build_sharded_vectorstore()."
+            )
+        if not qa_system.vectorstore:
+            qa_system.build_vectorstore()
+
+        exported = Path(index_dir) / INDEX_FILE
+        saved = Path(qa_system.vectorstore_path) / INDEX_FILE
+        if (
+            force_export
+            or not exported.exists()
+            or not saved.exists()
+            or saved.stat().st_mtime > exported.stat().st_mtime
+        ):
+            export_shared_index(qa_system.vectorstore, index_dir)
+        return cls(index_dir=index_dir, **kwargs)
+
+    def ask(self, question: str) -> Dict:
+        return self.executor.submit(_answer, question).result()
+
+    def batch_ask(self, questions: List[str]) -> List[Dict]:
+        return list(self.executor.map(_answer, questions))
+
+    def worker_pids(self) -> List[int]:
+        """PIDs of the workers this pool has started so far"""
+        while not self._pid_queue.empty():
+            self._pids.append(self._pid_queue.get())
+        return list(self._pids)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self._pid_queue.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    from qa_pipeline import BatteryQASystem
+
+    questions = [
+        "What is NCM battery?",
+        "What are the main products?",
+        "What is the revenue in 2024?",
+        "What are the ESG initiatives?",
+    ]
+
+    with ProcessPoolQA.from_qa_system(BatteryQASystem(), num_workers=4) as pool:
+        for result in pool.batch_ask(questions):
+            print(f"\nQuestion: {result['question']}")
+            print(f"Answer:\n{result['answer']}")
+            print(f"(worker {result['worker_pid']}, {result['elapsed_time']:.2f}s)")
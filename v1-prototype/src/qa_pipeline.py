@@ -1,6 +1,6 @@
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from bedrock_client import BedrockClientManager
 from data_ingestion import DocumentLoader
@@ -8,9 +8,51 @@ from dotenv import load_dotenv
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 from langchain_community.vectorstores import FAISS
+from sharded_index import ShardedVectorIndex
 
 load_dotenv()
 
+PROMPT_TEMPLATE = """
+<role>
+You are a technical documentation assistant specialized in LG Energy Solution's battery technology, products, and sustainability initiatives. 
+You have access to official company documents including ESG reports, annual reports, and technical specifications.
+</role>
+
+<guidelines>
+1. ACCURACY: Only use information explicitly stated in the provided context
+2. SPECIFICITY: Include technical terms, numerical data, and specific details
+3. STRUCTURE: Organize answers with clear paragraphs or bullet points
+4. SOURCES: Reference document types when making claims (e.g., "According to the ESG Report...")
+5. HONESTY: If information is not in the context, state: "This information is not available in the provided documents."
+6. PROFESSIONAL: Use technical language appropriate for industry professionals
+</guidelines>
+
+<context>
+{context}
+</context>
+
+<question>
+{question}
+</question>
+
+<answer_format>
+Provide a comprehensive answer that:
+- Directly addresses the question
+- Includes specific data points and technical details
+- Structures information clearly
+- Cites relevant document sources
+- Acknowledges any limitations in available information
+</answer_format>
+
+Answer:"""
+
+
+def format_sources(source_docs: List) -> List[Dict]:
+    return [
+        {"content": doc.page_content[:300] + "...", "metadata": doc.metadata}
+        for doc in source_docs
+    ]
+
 
 class BatteryQASystem:
     def __init__(
@@ -44,9 +86,9 @@ class BatteryQASystem:
 
         print("Building new vectorstore...")
         loader = DocumentLoader(data_path=self.data_path)
-        chunks = loader.load_and_split()
+        corpus = loader.load_and_split_offsets()
 
-        print(f"\nCreating embeddings for {len(chunks)} chunks...")
+        print(f"\nCreating embeddings for {len(corpus)} chunks...")
 
         import time
 
@@ -55,23 +97,22 @@ class BatteryQASystem:
         batch_size = 50
         start_time = time.time()
 
-        first_batch = chunks[:batch_size]
+        first_batch = corpus.to_documents(0, batch_size)
         print(f"Initializing vectorstore with first {len(first_batch)} chunks...")
         self.vectorstore = FAISS.from_documents(first_batch, self.embeddings)
 
-        remaining_chunks = chunks[batch_size:]
-        if remaining_chunks:
-            print(f"Adding remaining {len(remaining_chunks)} chunks in batches...")
+        if len(corpus) > batch_size:
+            print(f"Adding remaining {len(corpus) - batch_size} chunks in batches...")
 
             for i in tqdm(
-                range(0, len(remaining_chunks), batch_size), desc="Processing batches"
+                range(batch_size, len(corpus), batch_size), desc="Processing batches"
             ):
-                batch = remaining_chunks[i : i + batch_size]
+                batch = corpus.to_documents(i, i + batch_size)
                 self.vectorstore.add_documents(batch)
 
         elapsed = time.time() - start_time
         print(
-            f"✅ Embeddings created in {elapsed:.1f}s ({len(chunks)/elapsed:.1f} chunks/sec)"
+            f"✅ Embeddings created in {elapsed:.1f}s ({len(corpus)/elapsed:.1f} chunks/sec)"
         )
 
         Path(self.vectorstore_path).parent.mkdir(parents=True, exist_ok=True)
@@ -79,52 +120,55 @@ class BatteryQASystem:
 
         print(f"Vectorstore saved to {self.vectorstore_path}")
 
-    def setup_qa_chain(self, k: int = 3, search_type: str = "similarity"):
-        if not self.vectorstore:
-            raise ValueError("Vectorstore not loaded. Call build_vectorstore() first.")
-
-        print(f"Setting up QA chain (retrieval: top-{k}, search: {search_type})...")
-
-        retriever = self.vectorstore.as_retriever(
-            search_type=search_type, search_kwargs={"k": k}
+    def build_sharded_vectorstore(
+        self,
+        shards_path: str = "data/embeddings/battery_shards",
+        max_workers: int = 4,
+    ):
+        """PDF별 샤드 로드: 없어진 PDF의 샤드 제거, 새/변경된 PDF만 샤드로 (재)생성"""
+        index = ShardedVectorIndex(
+            shards_path, self.embeddings, max_workers, root=self.data_path
         )
 
-        template = """
-<role>
-You are a technical documentation assistant specialized in LG Energy Solution's battery technology, products, and sustainability initiatives. 
-You have access to official company documents including ESG reports, annual reports, and technical specifications.
-</role>
+        pdf_files = sorted(Path(self.data_path).glob("**/*.pdf"))
+        index.prune([str(pdf) for pdf in pdf_files])
+        new_files = [pdf for pdf in pdf_files if index.needs_build(str(pdf))]
 
-<guidelines>
-1. ACCURACY: Only use information explicitly stated in the provided context
-2. SPECIFICITY: Include technical terms, numerical data, and specific details
-3. STRUCTURE: Organize answers with clear paragraphs or bullet points
-4. SOURCES: Reference document types when making claims (e.g., "According to the ESG Report...")
-5. HONESTY: If information is not in the context, state: "This information is not available in the provided documents."
-6. PROFESSIONAL: Use technical language appropriate for industry professionals
-</guidelines>
+        if new_files:
+            print(f"Building shards for {len(new_files)} new or changed PDFs...")
+            chunks = []
+            for pdf in new_files:
+                chunks.extend(DocumentLoader(data_path=str(pdf)).load_and_split())
+            index.build(chunks)
 
-<context>
-{context}
-</context>
+        print(f"✅ Sharded vectorstore ready ({len(index.shard_names)} shards)")
+        self.vectorstore = index
 
-<question>
-{question}
-</question>
+    def setup_qa_chain(
+        self,
+        k: int = 3,
+        search_type: str = "similarity",
+        shard_filter: Optional[Dict] = None,
+    ):
+        if not self.vectorstore:
+            raise ValueError("Vectorstore not loaded. Call build_vectorstore() first.")
 
-<answer_format>
-Provide a comprehensive answer that:
-- Directly addresses the question
-- Includes specific data points and technical details
-- Structures information clearly
-- Cites relevant document sources
-- Acknowledges any limitations in available information
-</answer_format>
+        search_kwargs = {"k": k}
+        if shard_filter:
+            if not isinstance(self.vectorstore, ShardedVectorIndex):
+                raise ValueError(
+                    "shard_filter requires build_sharded_vectorstore() first."
+                )
+            search_kwargs["shards"] = shard_filter
 
-Answer:"""
+        print(f"Setting up QA chain (retrieval: top-{k}, search: {search_type})...")
+
+        retriever = self.vectorstore.as_retriever(
+            search_type=search_type, search_kwargs=search_kwargs
+        )
 
         prompt = PromptTemplate(
-            template=template, input_variables=["context", "question"]
+            template=PROMPT_TEMPLATE, input_variables=["context", "question"]
         )
 
         self.qa_chain = RetrievalQA.from_chain_type(
@@ -160,10 +204,7 @@ Answer:"""
         return {
             "question": question,
             "answer": answer,
-            "sources": [
-                {"content": doc.page_content[:300] + "...", "metadata": doc.metadata}
-                for doc in source_docs
-            ],
+            "sources": format_sources(source_docs),
         }
 
     def batch_ask_parallel(
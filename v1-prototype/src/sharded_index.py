@@ -0,0 +1,325 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _relative_parts(source: str, root: Optional[str] = None) -> Tuple[str, ...]:
+    """Parts of the resolved source path relative to `root` (default: cwd)"""
+    path = Path(source).resolve()
+    try:
+        return path.relative_to(Path(root or ".").resolve()).parts
+    except ValueError:
+        return path.parts[1:]
+
+
+def shard_name(source: str, root: Optional[str] = None) -> str:
+    """One shard per source document, named after its path relative to `root`.
+
+    Paths are resolved first, so `data/raw/a.pdf` and `./data/raw/a.pdf` map
+    to the same shard, while `raw/2024/a.pdf` and `raw/2025/a.pdf` do not.
+    """
+    parts = _relative_parts(source, root)
+    parts = [*parts[:-1], Path(parts[-1]).stem]
+    return "__".join(
+        re.sub(r"[^A-Za-z0-9_.-]+", "_", part).strip("_") for part in parts
+    )
+
+
+def file_fingerprint(source: str) -> Optional[str]:
+    """SHA-256 of the source file, or None if it is not a local file"""
+    path = Path(source)
+    if not path.is_file():
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def period_attributes(source: str, root: Optional[str] = None) -> Dict[str, str]:
+    """Infer report year/quarter from the path relative to `root`.
+
+    The file name is checked first (`2025_1Q_...`, `252Q_...`), then the
+    folders from nearest to `root`, so `2025/1Q/report.pdf` works too.
+    """
+    attributes: Dict[str, str] = {}
+    for part in reversed(_relative_parts(source, root)):
+        for key, value in _name_period(part).items():
+            attributes.setdefault(key, value)
+    return attributes
+
+
+def _name_period(name: str) -> Dict[str, str]:
+    attributes = {}
+
+    short = re.match(r"(\d{2})(\d)Q_", name)
+    year = re.search(r"(?<!\d)(20\d{2})(?!\d)", name)
+    quarter = re.search(r"(?<![A-Za-z0-9])(\d)Q", name)
+
+    if year:
+        attributes["year"] = year.group(1)
+    elif short:
+        attributes["year"] = "20" + short.group(1)
+
+    if short:
+        attributes["quarter"] = f"{short.group(2)}Q"
+    elif quarter:
+        attributes["quarter"] = f"{quarter.group(1)}Q"
+
+    return attributes
+
+
+class ShardedVectorIndex:
+    """FAISS index split into independent shards with a JSON manifest.
+
+    Each shard is a regular LangChain FAISS store saved under
+    `shards/<name>/`, so adding or replacing one shard never touches the
+    others. Queries are embedded once, searched on the selected shards in
+    parallel and merged into a global top-k by L2 distance. Shards can be
+    pruned up front by manifest attributes such as `{"year": "2025"}`.
+    Shards are named by source path relative to `root` and record the
+    source's SHA-256, so changed documents are rebuilt.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        embeddings,
+        max_workers: int = 4,
+        root: Optional[str] = None,
+    ):
+        self.index_path = Path(index_path)
+        self.embeddings = embeddings
+        self.max_workers = max_workers
+        self.root = root
+
+        self.manifest: Dict = {"shards": {}}
+        self._shards: Dict[str, FAISS] = {}
+        self._lock = threading.Lock()
+
+        if (self.index_path / MANIFEST_FILE).exists():
+            self.manifest = json.loads((self.index_path / MANIFEST_FILE).read_text())
+
+    @property
+    def shard_names(self) -> List[str]:
+        return sorted(self.manifest["shards"])
+
+    def shard_name(self, source: str) -> str:
+        return shard_name(source, self.root)
+
+    def needs_build(self, source: str) -> bool:
+        """True if `source` has no shard or its file changed since the build"""
+        entry = self.manifest["shards"].get(self.shard_name(source))
+        return entry is None or entry.get("sha256") != file_fingerprint(source)
+
+    def _save_manifest(self):
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path / (MANIFEST_FILE + ".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2, ensure_ascii=False))
+        os.replace(tmp, self.index_path / MANIFEST_FILE)
+
+    def _build_shard(
+        self, name: str, chunks: List[Document], batch_size: int = 50
+    ) -> FAISS:
+        vectorstore = FAISS.from_documents(chunks[:batch_size], self.embeddings)
+        for i in range(batch_size, len(chunks), batch_size):
+            vectorstore.add_documents(chunks[i : i + batch_size])
+
+        vectorstore.save_local(str(self.index_path / "shards" / name))
+        return vectorstore
+
+    def add_shard(
+        self,
+        name: str,
+        chunks: List[Document],
+        attributes: Optional[Dict[str, str]] = None,
+    ):
+        """Build (or replace) one shard and register it in the manifest"""
+        if not chunks:
+            raise ValueError(f"Shard '{name}' has no chunks")
+
+        vectorstore = self._build_shard(name, chunks)
+
+        with self._lock:
+            self._shards[name] = vectorstore
+            self.manifest["shards"][name] = {
+                "path": f"shards/{name}",
+                "chunks": len(chunks),
+                "created_at": time.time(),
+                **(attributes or {}),
+            }
+            self._save_manifest()
+
+        print(f"✅ Shard '{name}' saved ({len(chunks)} chunks)")
+
+    def build(
+        self,
+        chunks: List[Document],
+        shard_key: Callable[[Document], str] = lambda doc: doc.metadata["source"],
+        skip_existing: bool = True,
+    ) -> List[str]:
+        """Group chunks into shards and build missing or changed ones in parallel"""
+        groups: Dict[str, List[Document]] = {}
+        sources: Dict[str, str] = {}
+        for chunk in chunks:
+            key = shard_key(chunk)
+            name = self.shard_name(key)
+            groups.setdefault(name, []).append(chunk)
+            sources.setdefault(name, key)
+
+        todo = [
+            name
+            for name in groups
+            if not skip_existing or self.needs_build(sources[name])
+        ]
+        if not todo:
+            print("✅ All shards up to date")
+            return []
+
+        print(f"Building {len(todo)} shards with {self.max_workers} workers...")
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.add_shard,
+                    name,
+                    groups[name],
+                    {
+                        "source": sources[name],
+                        "sha256": file_fingerprint(sources[name]),
+                        **period_attributes(sources[name], self.root),
+                    },
+                )
+                for name in todo
+            ]
+            for future in futures:
+                future.result()
+
+        print(f"✅ Built {len(todo)} shards in {time.time() - start_time:.1f}s")
+        return todo
+
+    def prune(self, sources: List[str]) -> List[str]:
+        """Remove shards whose source is not in `sources` (deleted or renamed)"""
+        keep = {self.shard_name(source) for source in sources}
+        removed = [name for name in self.shard_names if name not in keep]
+        for name in removed:
+            self.remove_shard(name)
+        if removed:
+            print(f"Removed {len(removed)} shards without a source document")
+        return removed
+
+    def remove_shard(self, name: str):
+        with self._lock:
+            entry = self.manifest["shards"].pop(name)
+            self._shards.pop(name, None)
+            self._save_manifest()
+        shutil.rmtree(self.index_path / entry["path"], ignore_errors=True)
+
+    def select_shards(self, filters: Optional[Dict] = None) -> List[str]:
+        """Names of shards whose manifest attributes match every filter.
+
+        Filter values may be a single value or a list of accepted values.
+        """
+        if not filters:
+            return self.shard_names
+
+        selected = []
+        for name, entry in sorted(self.manifest["shards"].items()):
+            for key, accepted in filters.items():
+                if not isinstance(accepted, (list, tuple, set)):
+                    accepted = [accepted]
+                if entry.get(key) not in [str(v) for v in accepted]:
+                    break
+            else:
+                selected.append(name)
+        return selected
+
+    def _load_shard(self, name: str) -> FAISS:
+        with self._lock:
+            if name in self._shards:
+                return self._shards[name]
+
+        vectorstore = FAISS.load_local(
+            str(self.index_path / self.manifest["shards"][name]["path"]),
+            self.embeddings,
+            allow_dangerous_deserialization=True,
+        )
+        with self._lock:
+            return self._shards.setdefault(name, vectorstore)
+
+    def _search_shard(
+        self, name: str, vector: List[float], k: int
+    ) -> List[Tuple[Document, float]]:
+        return self._load_shard(name).similarity_search_with_score_by_vector(
+            vector, k=k
+        )
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filters: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        names = self.select_shards(filters)
+        if not names:
+            return []
+
+        vector = self.embeddings.embed_query(query)
+
+        workers = min(self.max_workers, len(names))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            per_shard = list(
+                executor.map(lambda name: self._search_shard(name, vector, k), names)
+            )
+
+        return heapq.nsmallest(
+            k, (hit for hits in per_shard for hit in hits), key=lambda hit: hit[1]
+        )
+
+    def similarity_search(
+        self, query: str, k: int = 4, filters: Optional[Dict] = None
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filters)]
+
+    def as_retriever(
+        self, search_type: str = "similarity", search_kwargs: Optional[Dict] = None
+    ) -> "ShardedRetriever":
+        if search_type != "similarity":
+            raise ValueError(
+                f"Sharded index only supports similarity search, got {search_type}"
+            )
+        search_kwargs = search_kwargs or {}
+        return ShardedRetriever(
+            index=self,
+            k=search_kwargs.get("k", 4),
+            filters=search_kwargs.get("shards"),
+        )
+
+
+class ShardedRetriever(BaseRetriever):
+    index: ShardedVectorIndex
+    k: int = 4
+    filters: Optional[Dict] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.index.similarity_search(query, k=self.k, filters=self.filters)
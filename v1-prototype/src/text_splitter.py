@@ -0,0 +1,188 @@
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from langchain.schema import Document
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+Span = Tuple[int, int]
+
+
+class ChunkSpan(NamedTuple):
+    """Chunk as a [start, end) range into the text of one page"""
+
+    page_id: int
+    start: int
+    end: int
+
+
+class ChunkedCorpus:
+    """Page texts plus chunk offsets; strings are sliced only on access.
+
+    Every chunk of a page refers to the same metadata dict, so treat
+    metadata as read-only.
+    """
+
+    def __init__(self, texts: List[str], metadatas: List[Dict], spans: List[ChunkSpan]):
+        self.texts = texts
+        self.metadatas = metadatas
+        self.spans = spans
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __iter__(self) -> Iterator[ChunkSpan]:
+        return iter(self.spans)
+
+    def text(self, span: ChunkSpan) -> str:
+        return self.texts[span.page_id][span.start : span.end]
+
+    def metadata(self, span: ChunkSpan) -> Dict:
+        return self.metadatas[span.page_id]
+
+    def iter_texts(self) -> Iterator[str]:
+        for span in self.spans:
+            yield self.text(span)
+
+    def to_documents(self, start: int = 0, end: Optional[int] = None) -> List[Document]:
+        """Materialize documents for spans[start:end] (metadata shared per page)"""
+        return [
+            Document(
+                page_content=self.text(span), metadata=self.metadatas[span.page_id]
+            )
+            for span in self.spans[start:end]
+        ]
+
+
+class OffsetTextSplitter:
+    """Recursive character splitter that works on offsets instead of substrings.
+
+    Produces the same chunks as LangChain's ``RecursiveCharacterTextSplitter``
+    with ``keep_separator=True``, ``strip_whitespace=True`` and ``len`` as the
+    length function, but never copies text while splitting: with the separator
+    kept on the following piece, every split and every merged chunk is a
+    contiguous range of the source text.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Optional[List[str]] = None,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or DEFAULT_SEPARATORS
+
+    def split_spans(self, text: str) -> List[Span]:
+        """Split text into (start, end) offsets"""
+        return self._split(text, 0, len(text), self.separators)
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_pages(
+        self, texts: Iterable[str], metadatas: Optional[Iterable[Dict]] = None
+    ) -> ChunkedCorpus:
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{}] * len(texts)
+
+        spans = []
+        for page_id, text in enumerate(texts):
+            for start, end in self.split_spans(text):
+                spans.append(ChunkSpan(page_id, start, end))
+
+        return ChunkedCorpus(texts, metadatas, spans)
+
+    def split_documents(self, documents: Iterable[Document]) -> ChunkedCorpus:
+        texts, metadatas = [], []
+        for doc in documents:
+            texts.append(doc.page_content)
+            metadatas.append(doc.metadata)
+        return self.split_pages(texts, metadatas)
+
+    def _split(self, text: str, lo: int, hi: int, separators: List[str]) -> List[Span]:
+        separator = separators[-1]
+        new_separators = []
+        for i, sep in enumerate(separators):
+            if sep == "":
+                separator = sep
+                break
+            if text.find(sep, lo, hi) != -1:
+                separator = sep
+                new_separators = separators[i + 1 :]
+                break
+
+        chunks = []
+        good_splits = []
+        for start, end in self._split_on(text, lo, hi, separator):
+            if end - start < self.chunk_size:
+                good_splits.append((start, end))
+                continue
+
+            if good_splits:
+                chunks.extend(self._merge(text, good_splits))
+                good_splits = []
+            if not new_separators:
+                chunks.append((start, end))
+            else:
+                chunks.extend(self._split(text, start, end, new_separators))
+
+        if good_splits:
+            chunks.extend(self._merge(text, good_splits))
+        return chunks
+
+    @staticmethod
+    def _split_on(text: str, lo: int, hi: int, separator: str) -> List[Span]:
+        """Cut [lo, hi) before each separator match, keeping it on the right piece"""
+        if not separator:
+            return [(i, i + 1) for i in range(lo, hi)]
+
+        splits = []
+        start = lo
+        pos = text.find(separator, lo, hi)
+        while pos != -1:
+            if pos > start:
+                splits.append((start, pos))
+            start = pos
+            pos = text.find(separator, pos + len(separator), hi)
+        if hi > start:
+            splits.append((start, hi))
+        return splits
+
+    def _merge(self, text: str, splits: List[Span]) -> List[Span]:
+        """Greedily combine adjacent splits into chunks with overlap"""
+        chunks = []
+        window = 0
+        total = 0
+        for i, (start, end) in enumerate(splits):
+            length = end - start
+            if total + length > self.chunk_size and i > window:
+                chunk = self._strip(text, splits[window][0], splits[i - 1][1])
+                if chunk is not None:
+                    chunks.append(chunk)
+                while total > self.chunk_overlap or (
+                    total + length > self.chunk_size and total > 0
+                ):
+                    total -= splits[window][1] - splits[window][0]
+                    window += 1
+            total += length
+
+        chunk = self._strip(text, splits[window][0], splits[-1][1])
+        if chunk is not None:
+            chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _strip(text: str, start: int, end: int) -> Optional[Span]:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return None
+        return start, end
@@ -0,0 +1,164 @@
+import functools
+import multiprocessing
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import process_serving
+from langchain.schema import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from process_serving import ProcessPoolQA, SharedIndex, export_shared_index
+from sharded_index import ShardedVectorIndex
+
+DOCS = [
+    Document(page_content=f"Chunk {i} about 배터리 products", metadata=meta)
+    for i, meta in enumerate(
+        [{"source": "data/raw/a.pdf", "page": p} for p in range(5)]
+        + [{"source": "data/raw/b.pdf", "page": 0}] * 3
+    )
+]
+
+
+class EchoLLM:
+    def invoke(self, prompt):
+        return SimpleNamespace(content=f"Echo: {len(prompt)}")
+
+
+def fake_models(size):
+    return DeterministicFakeEmbedding(size=size), EchoLLM()
+
+
+@pytest.fixture(scope="module")
+def vectorstore():
+    return FAISS.from_documents(DOCS, DeterministicFakeEmbedding(size=32))
+
+
+@pytest.fixture(scope="module")
+def index_dir(vectorstore, tmp_path_factory):
+    path = tmp_path_factory.mktemp("shared_index")
+    export_shared_index(vectorstore, str(path))
+    return str(path)
+
+
+class TestSharedIndex:
+
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_search_matches_vectorstore(self, vectorstore, index_dir, use_mmap):
+        index = SharedIndex(index_dir, use_mmap=use_mmap)
+        embeddings = DeterministicFakeEmbedding(size=32)
+
+        for query in ["Chunk 3", "products", "배터리"]:
+            expected = vectorstore.similarity_search(query, k=3)
+            actual = index.search(embeddings.embed_query(query), k=3)
+            assert actual == expected
+
+        index.close()
+
+    def test_metadata_stored_once_per_distinct_value(self, index_dir):
+        index = SharedIndex(index_dir)
+
+        assert len(index) == len(DOCS)
+        assert len(index.metadatas) == 6
+        assert index.document(5).metadata is index.document(7).metadata
+
+        index.close()
+
+    def test_mmap_without_faiss_support_raises(self, index_dir, monkeypatch):
+        monkeypatch.delattr(process_serving.faiss, "IO_FLAG_MMAP_IFC")
+
+        with pytest.raises(RuntimeError, match="use_mmap=False"):
+            SharedIndex(index_dir)
+        SharedIndex(index_dir, use_mmap=False).close()
+
+
+class TestProcessPoolQA:
+
+    def test_batch_ask_uses_worker_processes(self, index_dir):
+        questions = [f"Chunk {i}" for i in range(8)]
+
+        with ProcessPoolQA(
+            index_dir,
+            num_workers=2,
+            k=2,
+            model_factory=functools.partial(fake_models, 32),
+            mp_context="fork",
+        ) as pool:
+            results = pool.batch_ask(questions)
+            single = pool.ask("products")
+            pids = pool.worker_pids()
+
+        assert [r["question"] for r in results] == questions
+        assert all(r["answer"].startswith("Echo: ") for r in results)
+        assert all(len(r["sources"]) == 2 for r in results)
+        assert os.getpid() not in {r["worker_pid"] for r in results}
+        assert {r["worker_pid"] for r in results} <= set(pids)
+        assert len(pids) <= 2
+        assert single["sources"][0]["metadata"]["source"].startswith("data/raw/")
+
+    def test_missing_index_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            ProcessPoolQA(str(tmp_path / "missing"))
+
+    def test_worker_pids_exclude_other_children(self, index_dir):
+        ctx = multiprocessing.get_context("fork")
+        other = ctx.Process(target=time.sleep, args=(5,))
+        other.start()
+        try:
+            with ProcessPoolQA(
+                index_dir,
+                num_workers=1,
+                model_factory=functools.partial(fake_models, 32),
+                mp_context="fork",
+            ) as pool:
+                pool.ask("products")
+                assert other.pid not in pool.worker_pids()
+        finally:
+            other.terminate()
+            other.join()
+
+    def test_from_qa_system_reexports_rebuilt_vectorstore(self, tmp_path):
+        saved = tmp_path / "vectorstore"
+        shared = tmp_path / "shared"
+        qa_system = SimpleNamespace(
+            vectorstore=FAISS.from_documents(DOCS, DeterministicFakeEmbedding(size=32)),
+            vectorstore_path=str(saved),
+        )
+        qa_system.vectorstore.save_local(str(saved))
+        kwargs = dict(
+            num_workers=1,
+            model_factory=functools.partial(fake_models, 32),
+            mp_context="fork",
+        )
+
+        ProcessPoolQA.from_qa_system(qa_system, str(shared), **kwargs).close()
+        assert len(SharedIndex(str(shared))) == len(DOCS)
+
+        qa_system.vectorstore = FAISS.from_documents(
+            DOCS[:3], DeterministicFakeEmbedding(size=32)
+        )
+        qa_system.vectorstore.save_local(str(saved))
+        exported_at = (shared / "index.faiss").stat().st_mtime
+        os.utime(saved / "index.faiss", (exported_at + 1,) * 2)
+
+        ProcessPoolQA.from_qa_system(qa_system, str(shared), **kwargs).close()
+        assert len(SharedIndex(str(shared))) == 3
+
+    def test_from_qa_system_rejects_sharded_vectorstore(self, tmp_path):
+        qa_system = SimpleNamespace(
+            vectorstore=ShardedVectorIndex(
+                str(tmp_path / "shards"), DeterministicFakeEmbedding(size=32)
+            ),
+            vectorstore_path=str(tmp_path / "vectorstore"),
+        )
+
+        with pytest.raises(ValueError, match="build_vectorstore"):
+            ProcessPoolQA.from_qa_system(qa_system, str(tmp_path / "shared"))
+        assert not (tmp_path / "shared").exists()
@@ -0,0 +1,185 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from langchain.schema import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from sharded_index import ShardedVectorIndex, period_attributes, shard_name
+
+SOURCES = [
+    "data/raw/2024_LGES_Audit_Report_Consolidated_FS_ENG[1].pdf",
+    "data/raw/2025_1Q_LGES_Audit_Report_CONFS_en.pdf",
+    "data/raw/252Q_LGES_Audit_Report_CONFS_en.pdf",
+]
+
+
+def make_chunks(source, count=6):
+    return [
+        Document(
+            page_content=f"{shard_name(source)} chunk {i}",
+            metadata={"source": source, "page": i},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def embeddings():
+    return DeterministicFakeEmbedding(size=16)
+
+
+@pytest.fixture
+def chunks():
+    return [chunk for source in SOURCES for chunk in make_chunks(source)]
+
+
+@pytest.fixture
+def index(tmp_path, embeddings, chunks):
+    index = ShardedVectorIndex(str(tmp_path / "shards"), embeddings, max_workers=3)
+    index.build(chunks)
+    return index
+
+
+class TestShardedVectorIndex:
+
+    def test_period_attributes_from_filenames(self):
+        assert period_attributes(SOURCES[0]) == {"year": "2024"}
+        assert period_attributes(SOURCES[1]) == {"year": "2025", "quarter": "1Q"}
+        assert period_attributes(SOURCES[2]) == {"year": "2025", "quarter": "2Q"}
+
+    def test_period_attributes_from_year_folders(self, tmp_path):
+        root = tmp_path / "raw"
+
+        assert period_attributes(root / "2025" / "report.pdf", root) == {"year": "2025"}
+        assert period_attributes(root / "2025" / "1Q" / "report.pdf", root) == {
+            "year": "2025",
+            "quarter": "1Q",
+        }
+        assert period_attributes(root / "2024" / "2025_2Q_report.pdf", root) == {
+            "year": "2025",
+            "quarter": "2Q",
+        }
+        assert period_attributes(tmp_path / "2023" / "report.pdf", root) == {
+            "year": "2023"
+        }
+
+    def test_year_folder_layout_is_filterable(self, tmp_path, embeddings):
+        root = tmp_path / "raw"
+        sources = [str(root / year / "report.pdf") for year in ["2024", "2025"]]
+        index = ShardedVectorIndex(str(tmp_path / "shards"), embeddings, root=root)
+        index.build([chunk for source in sources for chunk in make_chunks(source)])
+
+        assert index.select_shards({"year": "2025"}) == ["2025__report"]
+
+    def test_builds_one_shard_per_source(self, index):
+        assert len(index.shard_names) == 3
+        for entry in index.manifest["shards"].values():
+            assert entry["chunks"] == 6
+            assert entry["source"] in SOURCES
+
+    def test_fan_out_matches_monolithic_index(self, index, embeddings, chunks):
+        monolithic = FAISS.from_documents(chunks, embeddings)
+
+        for query in ["chunk 1", "2025 report", "battery"]:
+            expected = monolithic.similarity_search_with_score(query, k=5)
+            actual = index.similarity_search_with_score(query, k=5)
+            assert [doc for doc, _ in actual] == [doc for doc, _ in expected]
+            assert [s for _, s in actual] == pytest.approx([s for _, s in expected])
+
+    def test_filters_prune_shards(self, index):
+        assert len(index.select_shards({"year": "2025"})) == 2
+        assert len(index.select_shards({"year": 2025, "quarter": "2Q"})) == 1
+        assert index.select_shards({"year": ["2023"]}) == []
+
+        docs = index.similarity_search("chunk", k=20, filters={"year": "2025"})
+        assert len(docs) == 12
+        assert all(doc.metadata["source"] != SOURCES[0] for doc in docs)
+
+    def test_adding_shard_leaves_others_untouched(self, index, embeddings, tmp_path):
+        shard_files = {
+            path: path.stat().st_mtime_ns
+            for path in (tmp_path / "shards" / "shards").rglob("*")
+            if path.is_file()
+        }
+
+        new_source = "data/raw/2025_3Q_LGES_Audit_Report_CONFS_en.pdf"
+        built = index.build(make_chunks(new_source, count=3))
+
+        assert built == [shard_name(new_source)]
+        assert all(path.stat().st_mtime_ns == m for path, m in shard_files.items())
+
+        reloaded = ShardedVectorIndex(str(tmp_path / "shards"), embeddings)
+        assert len(reloaded.shard_names) == 4
+        assert len(reloaded.select_shards({"quarter": "3Q"})) == 1
+        docs = reloaded.similarity_search("chunk", k=50, filters={"quarter": "3Q"})
+        assert {doc.metadata["source"] for doc in docs} == {new_source}
+
+    def test_remove_shard(self, index, tmp_path):
+        name = shard_name(SOURCES[0])
+        index.remove_shard(name)
+
+        assert name not in index.shard_names
+        assert not (tmp_path / "shards" / "shards" / name).exists()
+
+    def test_retriever_applies_shard_filter(self, index):
+        retriever = index.as_retriever(
+            search_kwargs={"k": 3, "shards": {"year": "2024"}}
+        )
+
+        docs = retriever.invoke("chunk")
+
+        assert len(docs) == 3
+        assert {doc.metadata["source"] for doc in docs} == {SOURCES[0]}
+
+    def test_shard_names_follow_relative_path(self, tmp_path):
+        root = tmp_path / "raw"
+
+        assert shard_name(root / "2024" / "report.pdf", root) == "2024__report"
+        assert shard_name(root / "2025" / "report.pdf", root) == "2025__report"
+        assert shard_name("data/raw/a b.pdf", "data/raw") == shard_name(
+            "./data/raw/../raw/a b.pdf", "./data/raw"
+        )
+
+    def test_changed_source_is_rebuilt(self, tmp_path, embeddings):
+        root = tmp_path / "raw"
+        for year in ["2024", "2025"]:
+            (root / year).mkdir(parents=True)
+            (root / year / "report.pdf").write_bytes(f"%PDF {year}".encode())
+        sources = [str(root / year / "report.pdf") for year in ["2024", "2025"]]
+
+        index = ShardedVectorIndex(str(tmp_path / "shards"), embeddings, root=root)
+        chunks = [chunk for source in sources for chunk in make_chunks(source)]
+
+        assert index.build(chunks) == ["2024__report", "2025__report"]
+        assert index.build(chunks) == []
+        assert not index.needs_build(sources[0])
+
+        (root / "2025" / "report.pdf").write_bytes(b"%PDF revised")
+
+        assert index.needs_build(sources[1])
+        assert index.build(make_chunks(sources[1], count=2)) == ["2025__report"]
+        assert index.manifest["shards"]["2025__report"]["chunks"] == 2
+        assert index.manifest["shards"]["2024__report"]["chunks"] == 6
+
+    def test_prune_removes_shards_of_missing_sources(self, tmp_path, embeddings):
+        root = tmp_path / "raw"
+        root.mkdir()
+        (root / "a.pdf").write_bytes(b"%PDF a")
+        index = ShardedVectorIndex(str(tmp_path / "shards"), embeddings, root=root)
+        index.build(make_chunks(str(root / "a.pdf")))
+
+        (root / "a.pdf").rename(root / "b.pdf")
+        removed = index.prune([str(pdf) for pdf in root.glob("**/*.pdf")])
+        index.build(make_chunks(str(root / "b.pdf")))
+
+        assert removed == ["a"]
+        assert index.shard_names == ["b"]
+        assert not (tmp_path / "shards" / "shards" / "a").exists()
+        docs = index.similarity_search("chunk", k=20)
+        assert len(docs) == 6
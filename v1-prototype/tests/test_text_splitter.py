@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from text_splitter import DEFAULT_SEPARATORS, ChunkSpan, OffsetTextSplitter
+
+SAMPLE_TEXT = (
+    "LG Energy Solution manufactures lithium-ion batteries.\n\n"
+    "Products include NCM and LFP cells for EVs. Energy storage systems "
+    "are another growing segment.\n"
+    "Revenue grew in 2024 driven by North American plants.   \n\n\n"
+    + "A very long line without natural break points " * 10
+    + "\n"
+    + "x" * 150
+)
+
+
+class TestOffsetTextSplitter:
+
+    @pytest.mark.parametrize(
+        "chunk_size, chunk_overlap", [(1000, 200), (120, 30), (40, 10), (25, 0)]
+    )
+    def test_matches_recursive_character_splitter(self, chunk_size, chunk_overlap):
+        reference = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=DEFAULT_SEPARATORS,
+            length_function=len,
+        )
+        splitter = OffsetTextSplitter(chunk_size, chunk_overlap)
+
+        assert splitter.split_text(SAMPLE_TEXT) == reference.split_text(SAMPLE_TEXT)
+
+    def test_spans_index_into_page_text(self):
+        documents = [
+            Document(page_content=SAMPLE_TEXT, metadata={"source": "a.pdf", "page": 0}),
+            Document(page_content="   ", metadata={"source": "a.pdf", "page": 1}),
+            Document(
+                page_content="Short page.", metadata={"source": "b.pdf", "page": 0}
+            ),
+        ]
+
+        corpus = OffsetTextSplitter(120, 30).split_documents(documents)
+
+        assert all(isinstance(span, ChunkSpan) for span in corpus)
+        assert {span.page_id for span in corpus} == {0, 2}
+        for span in corpus:
+            text = documents[span.page_id].page_content
+            assert corpus.text(span) == text[span.start : span.end]
+            assert corpus.metadata(span) is documents[span.page_id].metadata
+
+    def test_to_documents_shares_page_metadata(self):
+        metadata = {"source": "a.pdf", "page": 0}
+        corpus = OffsetTextSplitter(120, 30).split_pages([SAMPLE_TEXT], [metadata])
+
+        documents = corpus.to_documents()
+
+        assert len(documents) == len(corpus) > 1
+        assert [doc.page_content for doc in documents] == list(corpus.iter_texts())
+        assert all(doc.metadata is metadata for doc in documents)
+
+    def test_to_documents_materializes_a_slice(self):
+        corpus = OffsetTextSplitter(40, 10).split_pages([SAMPLE_TEXT], [{"page": 0}])
+
+        batch = corpus.to_documents(2, 5)
+
+        assert [doc.page_content for doc in batch] == list(corpus.iter_texts())[2:5]
+
+    def test_rejects_overlap_larger_than_chunk(self):
+        with pytest.raises(ValueError):
+            OffsetTextSplitter(chunk_size=100, chunk_overlap=200)
@@ -0,0 +1,122 @@
+"""Closed-loop load test for the QA HTTP server.
+
+Runs against an in-process server backed by StubKBClient by default, or
+against a running server with --url.
+
+Run from v2-production/:
+    python benchmarks/load_test_server.py --concurrency 64 --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import aiohttp
+from aiohttp import web
+from metrics import LatencyTracker
+from qa_pipeline import ProductionQASystem
+from server import QAServer
+from stub_kb_client import StubKBClient
+
+QUESTIONS = [
+    "What are the main products?",
+    "What is the ESG strategy?",
+    "What are the financial highlights?",
+    "What is the revenue in 2024?",
+    "What is the market share?",
+]
+
+
+async def run_load(url: str, concurrency: int, total: int, stream: bool):
+    statuses = Counter()
+    latencies = {200: LatencyTracker(window=total), 429: LatencyTracker(window=total)}
+    counter = iter(range(total))
+    endpoint = f"{url}/ask/stream" if stream else f"{url}/ask"
+
+    async def client_loop(session: aiohttp.ClientSession):
+        for i in counter:
+            question = QUESTIONS[i % len(QUESTIONS)] + f" (#{i})"
+            start = time.perf_counter()
+            async with session.post(endpoint, json={"question": question}) as resp:
+                await resp.read()
+                statuses[resp.status] += 1
+                if resp.status in latencies:
+                    latencies[resp.status].record(time.perf_counter() - start)
+
+    timeout = aiohttp.ClientTimeout(total=None)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*[client_loop(session) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+        async with session.get(f"{url}/metrics") as resp:
+            metrics = await resp.json()
+
+    return statuses, latencies, elapsed, metrics
+
+
+async def main(args):
+    runner = None
+    url = args.url
+
+    if url is None:
+        stub = StubKBClient(latency=args.stub_latency, jitter=args.stub_latency / 5)
+        server = QAServer(
+            qa=ProductionQASystem(client=stub),
+            max_queue_size=args.max_queue_size,
+            max_batch_size=args.max_batch_size,
+            num_workers=args.workers,
+            max_streams=args.max_streams,
+        )
+        runner = web.AppRunner(server.create_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", args.port)
+        await site.start()
+        url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        statuses, latencies, elapsed, metrics = await run_load(
+            url, args.concurrency, args.requests, args.stream
+        )
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    print(
+        f"\n{args.requests} requests, concurrency {args.concurrency}, "
+        f"{'stream' if args.stream else 'ask'} endpoint"
+    )
+    print("=" * 80)
+    print(f"Elapsed: {elapsed:.2f}s | Throughput: {args.requests / elapsed:.1f} req/s")
+    print(f"Status codes: {dict(sorted(statuses.items()))}")
+    for status, tracker in latencies.items():
+        if tracker.samples:
+            print(f"Latency {status} (ms): {tracker.percentiles()}")
+    print(f"Server queue capacity: {metrics['queue_capacity']}")
+    print(f"Server avg batch size: {metrics['avg_batch_size']}")
+    print(f"Server latency (ms): {metrics['latency_ms']}")
+    print(f"Server queue wait (ms): {metrics['queue_wait_ms']}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Target a running server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--stub-latency", type=float, default=0.2)
+    parser.add_argument("--max-queue-size", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-streams", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
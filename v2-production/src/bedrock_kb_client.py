@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 import boto3
 from config import config
@@ -9,6 +9,7 @@ class BedrockKBClient:
         self.client = boto3.client(
             "bedrock-agent-runtime", region_name=config.AWS_REGION
         )
+        self.runtime = boto3.client("bedrock-runtime", region_name=config.AWS_REGION)
         self.kb_id = config.KNOWLEDGE_BASE_ID
 
     def retrieve(self, query: str, max_results: int = 5) -> List[Dict]:
@@ -22,21 +23,22 @@ class BedrockKBClient:
 
         return response["retrievalResults"]
 
+    def _generation_config(self) -> Dict:
+        return {
+            "type": "KNOWLEDGE_BASE",
+            "knowledgeBaseConfiguration": {
+                "knowledgeBaseId": self.kb_id,
+                "modelArn": f"arn:aws:bedrock:{config.AWS_REGION}::foundation-model/{config.MODEL_ID}",
+                "retrievalConfiguration": {
+                    "vectorSearchConfiguration": {"numberOfResults": config.MAX_RESULTS}
+                },
+            },
+        }
+
     def retrieve_and_generate(self, query: str) -> Dict:
         response = self.client.retrieve_and_generate(
             input={"text": query},
-            retrieveAndGenerateConfiguration={
-                "type": "KNOWLEDGE_BASE",
-                "knowledgeBaseConfiguration": {
-                    "knowledgeBaseId": self.kb_id,
-                    "modelArn": f"arn:aws:bedrock:{config.AWS_REGION}::foundation-model/{config.MODEL_ID}",
-                    "retrievalConfiguration": {
-                        "vectorSearchConfiguration": {
-                            "numberOfResults": config.MAX_RESULTS
-                        }
-                    },
-                },
-            },
+            retrieveAndGenerateConfiguration=self._generation_config(),
         )
 
         return {
@@ -45,6 +47,60 @@ class BedrockKBClient:
             "session_id": response.get("sessionId"),
         }
 
+    def generate(self, query: str, references: List[Dict]) -> Dict:
+        """Answer from already retrieved references (e.g. a TieredRetriever).
+
+        Returns the same shape as retrieve_and_generate, with all references
+        attached to a single citation.
+        """
+        context = "\n\n".join(
+            f"[{i}] {ref['content']['text']}" for i, ref in enumerate(references, 1)
+        )
+        prompt = (
+            "Answer the question using only the numbered search results below. "
+            "If they do not contain the answer, say so.\n\n"
+            f"Search results:\n{context}\n\nQuestion: {query}"
+        )
+        response = self.runtime.converse(
+            modelId=config.MODEL_ID,
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+        )
+        answer = response["output"]["message"]["content"][0]["text"]
+
+        return {
+            "answer": answer,
+            "citations": [
+                {
+                    "generatedResponsePart": {"textResponsePart": {"text": answer}},
+                    "retrievedReferences": references,
+                }
+            ],
+            "session_id": None,
+        }
+
+    def retrieve_and_generate_stream(self, query: str) -> Iterator[Dict]:
+        """Yield {"text": ...} and {"citation": ...} events as they are generated.
+
+        botocore releases without RetrieveAndGenerateStream fall back to a
+        single text event from retrieve_and_generate.
+        """
+        if not hasattr(self.client, "retrieve_and_generate_stream"):
+            result = self.retrieve_and_generate(query)
+            yield {"text": result["answer"]}
+            for citation in result["citations"]:
+                yield {"citation": citation}
+            return
+
+        response = self.client.retrieve_and_generate_stream(
+            input={"text": query},
+            retrieveAndGenerateConfiguration=self._generation_config(),
+        )
+        for event in response["stream"]:
+            if "output" in event:
+                yield {"text": event["output"]["text"]}
+            elif "citation" in event:
+                yield {"citation": event["citation"]}
+
 
 if __name__ == "__main__":
     client = BedrockKBClient()
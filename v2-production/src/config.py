@@ -18,8 +18,13 @@ class Config:
     KNOWLEDGE_BASE_ID: str = os.getenv("KNOWLEDGE_BASE_ID", "")
     DATA_SOURCE_ID: str = os.getenv("DATA_SOURCE_ID", "")
     S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_PREFIX: str = os.getenv("S3_PREFIX", "documents/")
 
     MODEL_ID: str = "anthropic.claude-3-haiku-20240307-v1:0"
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "amazon.titan-embed-text-v1")
+    REPLICA_INDEX_PATH: str = os.getenv(
+        "REPLICA_INDEX_PATH", "../v1-prototype/data/embeddings/battery_vectorstore"
+    )
     MAX_RESULTS: int = 5
     LOG_GROUP: str = os.getenv("LOG_GROUP", "/aws/bedrock-rag-qa-v2-west/application")
 
@@ -51,5 +56,6 @@ if __name__ == "__main__":
         print(f"   Knowledge Base: {config.KNOWLEDGE_BASE_ID}")
         print(f"   Data Source: {config.DATA_SOURCE_ID}")
         print(f"   S3 Bucket: {config.S3_BUCKET}")
+        print(f"   S3 Prefix: {config.S3_PREFIX}")
     except ValueError as e:
         print(f"\nError: {e}")
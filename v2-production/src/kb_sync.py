@@ -0,0 +1,310 @@
+# src/kb_sync.py
+import argparse
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from config import config
+from logger import get_logger
+from s3transfer.utils import ChunksizeAdjuster
+
+logger = get_logger(__name__)
+
+MB = 1024 * 1024
+INGESTION_DONE_STATUSES = {"COMPLETE", "FAILED", "STOPPED"}
+
+
+def compute_etag(path: Path, transfer_config: TransferConfig) -> str:
+    """Compute the ETag S3 will report for `path` uploaded with `transfer_config`.
+
+    Single-part uploads get the MD5 of the body; multipart uploads get the
+    MD5 of the concatenated part digests followed by the part count.
+    """
+    size = path.stat().st_size
+
+    if size < transfer_config.multipart_threshold:
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(MB), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    part_size = ChunksizeAdjuster().adjust_chunksize(
+        transfer_config.multipart_chunksize, size
+    )
+    part_digests = []
+    with open(path, "rb") as f:
+        for part in iter(lambda: f.read(part_size), b""):
+            part_digests.append(hashlib.md5(part).digest())
+
+    combined = hashlib.md5(b"".join(part_digests)).hexdigest()
+    return f"{combined}-{len(part_digests)}"
+
+
+def matches_pattern(relative_key: str, pattern: str) -> bool:
+    """Whether `Path(local_dir).glob(pattern)` would pick up `relative_key`"""
+    path = PurePosixPath(relative_key)
+    if pattern.startswith("**/"):
+        return path.match(pattern[3:])
+    return len(path.parts) == len(PurePosixPath(pattern).parts) and path.match(pattern)
+
+
+@dataclass
+class SyncPlan:
+    uploads: List[Tuple[Path, str]] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.uploads or self.deletes)
+
+
+class KnowledgeBaseSync:
+    """Upload changed documents to S3 and re-ingest the knowledge base data source"""
+
+    def __init__(
+        self,
+        s3_client=None,
+        agent_client=None,
+        bucket: Optional[str] = None,
+        prefix: Optional[str] = None,
+        max_workers: int = 4,
+        transfer_config: Optional[TransferConfig] = None,
+    ):
+        self.s3 = s3_client or boto3.client("s3", region_name=config.AWS_REGION)
+        self.agent = agent_client or boto3.client(
+            "bedrock-agent", region_name=config.AWS_REGION
+        )
+        self.bucket = bucket or config.S3_BUCKET
+        self.prefix = config.S3_PREFIX if prefix is None else prefix
+        self.kb_id = config.KNOWLEDGE_BASE_ID
+        self.data_source_id = config.DATA_SOURCE_ID
+        self.max_workers = max_workers
+        self.transfer_config = transfer_config or TransferConfig(
+            multipart_threshold=8 * MB,
+            multipart_chunksize=8 * MB,
+            max_concurrency=4,
+        )
+
+    def list_remote_etags(self, pattern: Optional[str] = None) -> Dict[str, str]:
+        """ETags of objects under the prefix, limited to `pattern` if given.
+
+        Other objects, such as `.metadata.json` sidecars, are left out so they
+        are never compared against or deleted.
+        """
+        etags = {}
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if pattern and not matches_pattern(key[len(self.prefix) :], pattern):
+                    continue
+                etags[key] = obj["ETag"].strip('"')
+        return etags
+
+    def local_files(self, local_dir: str, pattern: str = "**/*.pdf") -> Dict[str, Path]:
+        """Map S3 keys to the local files they are synced from"""
+        root = Path(local_dir)
+        if not root.is_dir():
+            raise ValueError(f"Path does not exist: {local_dir}")
+
+        return {
+            self.prefix + path.relative_to(root).as_posix(): path
+            for path in sorted(p for p in root.glob(pattern) if p.is_file())
+        }
+
+    def local_etags(self, local_dir: str, pattern: str = "**/*.pdf") -> Dict[str, str]:
+        return {
+            key: compute_etag(path, self.transfer_config)
+            for key, path in self.local_files(local_dir, pattern).items()
+        }
+
+    def plan(
+        self, local_dir: str, pattern: str = "**/*.pdf", delete: bool = False
+    ) -> SyncPlan:
+        local = self.local_files(local_dir, pattern)
+        remote = self.list_remote_etags(pattern)
+        plan = SyncPlan()
+
+        for key, path in local.items():
+            if remote.pop(key, None) == compute_etag(path, self.transfer_config):
+                plan.unchanged.append(key)
+            else:
+                plan.uploads.append((path, key))
+
+        if delete:
+            plan.deletes = sorted(remote)
+
+        return plan
+
+    def _upload(self, path: Path, key: str) -> float:
+        start_time = time.time()
+        self.s3.upload_file(str(path), self.bucket, key, Config=self.transfer_config)
+        return time.time() - start_time
+
+    def upload(self, plan: SyncPlan) -> float:
+        start_time = time.time()
+        total_bytes = sum(path.stat().st_size for path, _ in plan.uploads)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._upload, path, key): (path, key)
+                for path, key in plan.uploads
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                path, key = futures[future]
+                elapsed = future.result()
+                size_mb = path.stat().st_size / MB
+                logger.info(
+                    f"[{i}/{len(plan.uploads)}] Uploaded s3://{self.bucket}/{key} "
+                    f"({size_mb:.1f} MB in {elapsed:.2f}s)"
+                )
+
+        for key in plan.deletes:
+            self.s3.delete_object(Bucket=self.bucket, Key=key)
+            logger.info(f"Deleted s3://{self.bucket}/{key}")
+
+        elapsed = time.time() - start_time
+        if plan.uploads:
+            logger.info(
+                f"Uploaded {len(plan.uploads)} files ({total_bytes / MB:.1f} MB) "
+                f"in {elapsed:.2f}s"
+            )
+        return elapsed
+
+    def start_ingestion(self) -> str:
+        response = self.agent.start_ingestion_job(
+            knowledgeBaseId=self.kb_id, dataSourceId=self.data_source_id
+        )
+        job_id = response["ingestionJob"]["ingestionJobId"]
+        logger.info(f"Started ingestion job {job_id}")
+        return job_id
+
+    def wait_for_ingestion(
+        self, job_id: str, poll_interval: float = 10.0, timeout: float = 1800.0
+    ) -> Dict:
+        start_time = time.time()
+        last_status = None
+
+        while True:
+            job = self.agent.get_ingestion_job(
+                knowledgeBaseId=self.kb_id,
+                dataSourceId=self.data_source_id,
+                ingestionJobId=job_id,
+            )["ingestionJob"]
+            elapsed = time.time() - start_time
+
+            status = job["status"]
+            stats = job.get("statistics", {})
+            if status != last_status:
+                logger.info(
+                    f"Ingestion job {job_id}: {status} after {elapsed:.0f}s "
+                    f"(scanned {stats.get('numberOfDocumentsScanned', 0)}, "
+                    f"indexed {stats.get('numberOfNewDocumentsIndexed', 0)} new / "
+                    f"{stats.get('numberOfModifiedDocumentsIndexed', 0)} modified, "
+                    f"failed {stats.get('numberOfDocumentsFailed', 0)})"
+                )
+                last_status = status
+
+            if status in INGESTION_DONE_STATUSES:
+                if status != "COMPLETE":
+                    logger.error(
+                        f"Ingestion job {job_id} {status}: "
+                        f"{job.get('failureReasons', [])}"
+                    )
+                return job
+
+            if elapsed > timeout:
+                raise TimeoutError(
+                    f"Ingestion job {job_id} still {status} after {timeout:.0f}s"
+                )
+
+            time.sleep(poll_interval)
+
+    def sync(
+        self,
+        local_dir: str,
+        pattern: str = "**/*.pdf",
+        delete: bool = False,
+        force_ingest: bool = False,
+        dry_run: bool = False,
+        poll_interval: float = 10.0,
+        timeout: float = 1800.0,
+    ) -> Dict:
+        start_time = time.time()
+
+        plan = self.plan(local_dir, pattern=pattern, delete=delete)
+        logger.info(
+            f"Sync plan for s3://{self.bucket}/{self.prefix}: "
+            f"{len(plan.uploads)} to upload, {len(plan.unchanged)} unchanged, "
+            f"{len(plan.deletes)} to delete"
+        )
+
+        result = {
+            "uploaded": [key for _, key in plan.uploads],
+            "unchanged": plan.unchanged,
+            "deleted": plan.deletes,
+            "upload_time": 0.0,
+            "ingestion_job": None,
+            "ingestion_time": 0.0,
+            "status": "dry_run" if dry_run else "up_to_date",
+        }
+
+        if dry_run:
+            result["elapsed_time"] = time.time() - start_time
+            return result
+
+        result["upload_time"] = self.upload(plan)
+
+        if plan.has_changes or force_ingest:
+            ingestion_start = time.time()
+            job_id = self.start_ingestion()
+            job = self.wait_for_ingestion(
+                job_id, poll_interval=poll_interval, timeout=timeout
+            )
+            result["ingestion_job"] = job
+            result["ingestion_time"] = time.time() - ingestion_start
+            result["status"] = "success" if job["status"] == "COMPLETE" else "error"
+        else:
+            logger.info("No document changes, skipping ingestion")
+
+        result["elapsed_time"] = time.time() - start_time
+        logger.info(
+            f"Sync finished in {result['elapsed_time']:.2f}s "
+            f"(upload {result['upload_time']:.2f}s, "
+            f"ingestion {result['ingestion_time']:.2f}s)"
+        )
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Upload changed documents to S3 and sync the knowledge base"
+    )
+    parser.add_argument("--local-dir", default="../v1-prototype/data/raw")
+    parser.add_argument("--pattern", default="**/*.pdf")
+    parser.add_argument("--delete", action="store_true")
+    parser.add_argument("--force-ingest", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    config.validate()
+
+    result = KnowledgeBaseSync().sync(
+        args.local_dir,
+        pattern=args.pattern,
+        delete=args.delete,
+        force_ingest=args.force_ingest,
+        dry_run=args.dry_run,
+    )
+
+    print(f"\nStatus: {result['status']}")
+    print(f"Uploaded: {len(result['uploaded'])}")
+    print(f"Unchanged: {len(result['unchanged'])}")
+    print(f"Deleted: {len(result['deleted'])}")
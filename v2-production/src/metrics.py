@@ -0,0 +1,31 @@
+# src/metrics.py
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling window of latencies (seconds) with percentile summaries"""
+
+    def __init__(self, window: int = 2048):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        if not self.samples:
+            return {"p50": None, "p90": None, "p99": None, "max": None}
+
+        ordered = sorted(self.samples)
+
+        def pick(q: float) -> float:
+            return round(
+                ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1
+            )
+
+        return {
+            "p50": pick(0.50),
+            "p90": pick(0.90),
+            "p99": pick(0.99),
+            "max": round(ordered[-1] * 1000, 1),
+        }
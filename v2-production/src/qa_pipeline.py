@@ -1,19 +1,32 @@
 # src/qa_pipeline.py
+import argparse
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from bedrock_kb_client import BedrockKBClient
+from config import config
 from logger import get_logger
 
 logger = get_logger(__name__)
 
 
 class ProductionQASystem:
-    def __init__(self, verbose: bool = False):
-        self.client = BedrockKBClient()
+    def __init__(self, verbose: bool = False, client=None, retriever=None):
+        """`retriever` (e.g. a TieredRetriever) replaces the KB's own retrieval;
+        answers are then generated from its results with `client.generate`.
+        """
+        self.client = client or BedrockKBClient()
+        self.retriever = retriever
         self.verbose = verbose
 
+    def _retrieve_and_generate(self, question: str) -> Dict:
+        if self.retriever is None:
+            return self.client.retrieve_and_generate(question)
+
+        references = self.retriever.retrieve(question, max_results=config.MAX_RESULTS)
+        return self.client.generate(question, references)
+
     def ask(self, question: str) -> Dict:
         if self.verbose:
             logger.info(f"Processing question: {question[:50]}...")
@@ -21,7 +34,7 @@ class ProductionQASystem:
         start_time = time.time()
 
         try:
-            result = self.client.retrieve_and_generate(question)
+            result = self._retrieve_and_generate(question)
             elapsed = time.time() - start_time
 
             if self.verbose:
@@ -39,6 +52,37 @@ class ProductionQASystem:
             logger.error(f"Error processing question: {e}")
             return {"question": question, "error": str(e), "status": "error"}
 
+    def ask_stream(self, question: str) -> Iterator[Dict]:
+        """Yield answer text chunks, then a final summary event"""
+        start_time = time.time()
+        citations = []
+
+        try:
+            if self.retriever is None:
+                stream = self.client.retrieve_and_generate_stream(question)
+            else:
+                result = self._retrieve_and_generate(question)
+                stream = [{"text": result["answer"]}] + [
+                    {"citation": citation} for citation in result["citations"]
+                ]
+
+            for event in stream:
+                if "text" in event:
+                    yield {"text": event["text"]}
+                elif "citation" in event:
+                    citations.append(event["citation"])
+
+            yield {
+                "question": question,
+                "citations": citations,
+                "elapsed_time": time.time() - start_time,
+                "status": "success",
+            }
+
+        except Exception as e:
+            logger.error(f"Error streaming question: {e}")
+            yield {"question": question, "error": str(e), "status": "error"}
+
     def ask_batch(self, questions: List[str], max_workers: int = 4) -> List[Dict]:
         if self.verbose:
             logger.info(f"Processing {len(questions)} questions in parallel")
@@ -94,8 +138,21 @@ class ProductionQASystem:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Production QA system test")
+    parser.add_argument(
+        "--tiered",
+        action="store_true",
+        help="Retrieve through the local replica index with KB fallback",
+    )
+    args = parser.parse_args()
+
     # CLI mode: verbose logging
-    qa = ProductionQASystem(verbose=True)
+    retriever = None
+    if args.tiered:
+        from tiered_retriever import TieredRetriever
+
+        retriever = TieredRetriever()
+    qa = ProductionQASystem(verbose=True, retriever=retriever)
 
     print("=" * 80)
     print("PRODUCTION QA SYSTEM TEST")
@@ -122,3 +179,6 @@ if __name__ == "__main__":
         qa.print_result(r, show_citations=False)
 
     qa.print_batch_summary(results)
+
+    if retriever is not None:
+        retriever.print_stats()
@@ -0,0 +1,401 @@
+# src/server.py
+import argparse
+import asyncio
+import contextlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from aiohttp import web
+from logger import get_logger
+from metrics import LatencyTracker
+from qa_pipeline import ProductionQASystem
+
+logger = get_logger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request is rejected by admission control"""
+
+
+@dataclass
+class PendingQuestion:
+    question: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Bounded request queue drained by workers in small batches.
+
+    Each worker waits up to `max_batch_wait` seconds to collect up to
+    `max_batch_size` questions, answers identical questions once, and runs
+    each question through `ProductionQASystem.ask` on a shared thread pool
+    so the event loop never blocks on Bedrock. Questions whose caller has
+    gone away are dropped, and questions queued longer than `max_queue_wait`
+    seconds fail with `Overloaded` instead of being answered late.
+    """
+
+    def __init__(
+        self,
+        qa: ProductionQASystem,
+        max_queue_size: int = 64,
+        max_batch_size: int = 8,
+        max_batch_wait: float = 0.01,
+        num_workers: int = 4,
+        max_queue_wait: float = 5.0,
+    ):
+        self.qa = qa
+        self.max_queue_size = max_queue_size
+        self.max_queue_wait = max_queue_wait
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.num_workers = num_workers
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor = ThreadPoolExecutor(max_workers=num_workers * max_batch_size)
+        self.workers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.batches = 0
+        self.batched_questions = 0
+        self.expired = 0
+        self.abandoned = 0
+        self.queue_wait = LatencyTracker()
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.num_workers)
+        ]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    def submit(self, question: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait(PendingQuestion(question, future))
+        except asyncio.QueueFull:
+            raise Overloaded(f"Request queue full ({self.max_queue_size})")
+        return future
+
+    async def _collect(self) -> List[PendingQuestion]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_batch_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def _admit(self, batch: List[PendingQuestion]) -> List[PendingQuestion]:
+        """Drop abandoned questions and fail the ones that waited too long"""
+        now = time.perf_counter()
+        admitted = []
+        for pending in batch:
+            waited = now - pending.enqueued_at
+            self.queue_wait.record(waited)
+
+            if pending.future.done():
+                self.abandoned += 1
+            elif waited > self.max_queue_wait:
+                self.expired += 1
+                pending.future.set_exception(
+                    Overloaded(
+                        f"Queued for {waited:.1f}s "
+                        f"(max queue wait {self.max_queue_wait}s)"
+                    )
+                )
+            else:
+                admitted.append(pending)
+        return admitted
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = self._admit(await self._collect())
+            if not batch:
+                continue
+
+            questions = list(dict.fromkeys(p.question for p in batch))
+            self.in_flight += len(batch)
+            self.batches += 1
+            self.batched_questions += len(batch)
+
+            try:
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(self.executor, self.qa.ask, question)
+                        for question in questions
+                    )
+                )
+                answers = dict(zip(questions, results))
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_result(answers[pending.question])
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} failed: {e}")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+            finally:
+                self.in_flight -= len(batch)
+
+
+class QAServer:
+    """Async HTTP front end for ProductionQASystem.
+
+    Endpoints:
+        POST /ask         {"question": ...} -> answer JSON
+        POST /ask/stream  {"question": ...} -> server-sent events
+        GET  /metrics     queue depth, counters, latency percentiles
+        GET  /health
+    """
+
+    def __init__(
+        self,
+        qa: Optional[ProductionQASystem] = None,
+        max_queue_size: int = 64,
+        max_batch_size: int = 8,
+        max_batch_wait: float = 0.01,
+        num_workers: int = 4,
+        max_streams: int = 16,
+        retry_after: int = 1,
+        max_queue_wait: float = 5.0,
+    ):
+        self.qa = qa or ProductionQASystem()
+        self.batcher = MicroBatcher(
+            self.qa,
+            max_queue_size=max_queue_size,
+            max_batch_size=max_batch_size,
+            max_batch_wait=max_batch_wait,
+            num_workers=num_workers,
+            max_queue_wait=max_queue_wait,
+        )
+        self.max_streams = max_streams
+        self.active_streams = 0
+        self.stream_executor = ThreadPoolExecutor(max_workers=max_streams)
+        self.retry_after = retry_after
+
+        self.latency = LatencyTracker()
+        self.counters = {"accepted": 0, "rejected": 0, "success": 0, "error": 0}
+        self.started_at = time.time()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/ask", self.handle_ask)
+        app.router.add_post("/ask/stream", self.handle_ask_stream)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/health", self.handle_health)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: web.Application):
+        await self.batcher.start()
+
+    async def _on_cleanup(self, app: web.Application):
+        await self.batcher.stop()
+        self.stream_executor.shutdown(wait=False)
+
+    def _reject(self, reason: str) -> web.Response:
+        self.counters["rejected"] += 1
+        return web.json_response(
+            {"error": reason, "status": "rejected"},
+            status=429,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def _read_question(self, request: web.Request) -> str:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(reason="Request body must be JSON")
+
+        question = body.get("question") if isinstance(body, dict) else None
+        if not isinstance(question, str) or not question.strip():
+            raise web.HTTPBadRequest(reason="'question' must be a non-empty string")
+        return question
+
+    def _record(self, start_time: float, status: str):
+        self.latency.record(time.perf_counter() - start_time)
+        self.counters["success" if status == "success" else "error"] += 1
+
+    async def handle_ask(self, request: web.Request) -> web.Response:
+        question = await self._read_question(request)
+        start_time = time.perf_counter()
+
+        try:
+            future = self.batcher.submit(question)
+        except Overloaded as e:
+            return self._reject(str(e))
+        self.counters["accepted"] += 1
+
+        try:
+            result = await future
+        except Overloaded as e:
+            return self._reject(str(e))
+        except Exception as e:
+            result = {"question": question, "error": str(e), "status": "error"}
+
+        self._record(start_time, result["status"])
+        return web.json_response(
+            result, status=200 if result["status"] == "success" else 502
+        )
+
+    async def handle_ask_stream(self, request: web.Request) -> web.StreamResponse:
+        question = await self._read_question(request)
+        start_time = time.perf_counter()
+
+        if self.active_streams >= self.max_streams:
+            return self._reject(f"Too many active streams ({self.max_streams})")
+        self.active_streams += 1
+        self.counters["accepted"] += 1
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        status = "error"
+
+        try:
+            await response.prepare(request)
+            async with contextlib.aclosing(self._stream_events(question)) as events:
+                async for event in events:
+                    status = event.get("status", status)
+                    await response.write(
+                        f"data: {json.dumps(event)}\n\n".encode("utf-8")
+                    )
+            await response.write_eof()
+        finally:
+            self.active_streams -= 1
+            self._record(start_time, status)
+
+        return response
+
+    async def _stream_events(self, question: str):
+        """Run the blocking ask_stream generator in a thread and relay its events"""
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                for event in self.qa.ask_stream(question):
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, done)
+
+        producer = loop.run_in_executor(self.stream_executor, produce)
+        try:
+            while True:
+                event = await events.get()
+                if event is done:
+                    break
+                yield event
+        finally:
+            cancelled.set()
+            await producer
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        batcher = self.batcher
+        return web.json_response(
+            {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "queue_depth": batcher.depth,
+                "queue_capacity": batcher.max_queue_size,
+                "in_flight": batcher.in_flight,
+                "active_streams": self.active_streams,
+                "requests": self.counters,
+                "avg_batch_size": (
+                    round(batcher.batched_questions / batcher.batches, 2)
+                    if batcher.batches
+                    else 0.0
+                ),
+                "latency_ms": self.latency.percentiles(),
+                "queue_wait_ms": batcher.queue_wait.percentiles(),
+                "expired": batcher.expired,
+                "abandoned": batcher.abandoned,
+            }
+        )
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the QA pipeline over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-queue-size", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-batch-wait", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-streams", type=int, default=16)
+    parser.add_argument("--max-queue-wait", type=float, default=5.0)
+    parser.add_argument(
+        "--stub", action="store_true", help="Use StubKBClient instead of Bedrock"
+    )
+    parser.add_argument("--stub-latency", type=float, default=0.5)
+    parser.add_argument(
+        "--tiered",
+        action="store_true",
+        help="Retrieve through the local replica index with KB fallback",
+    )
+    args = parser.parse_args()
+
+    client = None
+    if args.stub:
+        from stub_kb_client import StubKBClient
+
+        client = StubKBClient(latency=args.stub_latency)
+
+    retriever = None
+    if args.tiered:
+        from tiered_retriever import TieredRetriever
+
+        retriever = TieredRetriever(kb_client=client)
+
+    server = QAServer(
+        qa=ProductionQASystem(client=client, retriever=retriever),
+        max_queue_size=args.max_queue_size,
+        max_batch_size=args.max_batch_size,
+        max_batch_wait=args.max_batch_wait,
+        num_workers=args.workers,
+        max_streams=args.max_streams,
+        max_queue_wait=args.max_queue_wait,
+    )
+
+    logger.info(f"Serving on http://{args.host}:{args.port}")
+    # Cancel handlers of disconnected clients so their queued questions are dropped
+    web.run_app(
+        server.create_app(),
+        host=args.host,
+        port=args.port,
+        handler_cancellation=True,
+    )
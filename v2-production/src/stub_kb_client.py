@@ -0,0 +1,76 @@
+# src/stub_kb_client.py
+import random
+import time
+from typing import Dict, Iterator, List
+
+
+class StubKBClient:
+    """Offline stand-in for BedrockKBClient with simulated latency.
+
+    Used for local load testing of the serving layer without AWS credentials.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.1,
+        chunk_delay: float = 0.02,
+        error_rate: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+
+    def _sleep(self):
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if random.random() < self.error_rate:
+            raise RuntimeError("Simulated Bedrock error")
+
+    def _answer(self, query: str) -> str:
+        return f"Stub answer for: {query}"
+
+    def _citation(self, query: str) -> Dict:
+        return {
+            "generatedResponsePart": {
+                "textResponsePart": {"text": self._answer(query)}
+            },
+            "retrievedReferences": [
+                {
+                    "content": {"text": "Stub reference text"},
+                    "location": {
+                        "type": "S3",
+                        "s3Location": {"uri": "s3://stub-bucket/documents/stub.pdf"},
+                    },
+                }
+            ],
+        }
+
+    def retrieve(self, query: str, max_results: int = 5) -> List[Dict]:
+        self._sleep()
+        return self._citation(query)["retrievedReferences"][:max_results]
+
+    def retrieve_and_generate(self, query: str) -> Dict:
+        self._sleep()
+        return {
+            "answer": self._answer(query),
+            "citations": [self._citation(query)],
+            "session_id": None,
+        }
+
+    def generate(self, query: str, references: List[Dict]) -> Dict:
+        self._sleep()
+        citation = self._citation(query)
+        citation["retrievedReferences"] = references
+        return {
+            "answer": self._answer(query),
+            "citations": [citation],
+            "session_id": None,
+        }
+
+    def retrieve_and_generate_stream(self, query: str) -> Iterator[Dict]:
+        self._sleep()
+        for word in self._answer(query).split(" "):
+            time.sleep(self.chunk_delay)
+            yield {"text": word + " "}
+        yield {"citation": self._citation(query)}
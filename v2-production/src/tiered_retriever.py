@@ -0,0 +1,346 @@
+# src/tiered_retriever.py
+import argparse
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+from bedrock_kb_client import BedrockKBClient
+from config import config
+from kb_sync import KnowledgeBaseSync, compute_etag
+from langchain_aws import BedrockEmbeddings
+from langchain_community.vectorstores import FAISS
+from logger import get_logger
+from metrics import LatencyTracker
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "replica_manifest.json"
+INDEX_FILES = ("index.faiss", "index.pkl")
+
+
+def index_fingerprint(index_path: str) -> str:
+    """SHA-256 over the files FAISS.save_local writes, identifying one build"""
+    digest = hashlib.sha256()
+    for name in INDEX_FILES:
+        with open(Path(index_path) / name, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(
+    index_path: str,
+    local_dir: str,
+    sync: Optional[KnowledgeBaseSync] = None,
+    pattern: str = "**/*.pdf",
+) -> Dict:
+    """Record which S3 document versions a local replica index was built from.
+
+    ETags are computed the same way KnowledgeBaseSync compares them, so the
+    manifest matches the bucket right after `kb_sync.py` uploads `local_dir`.
+    The manifest is tied to the current index build by its fingerprint, and
+    refused if any document changed after the index was saved. `sources`
+    maps each document's path relative to `local_dir` to its S3 key.
+    """
+    sync = sync or KnowledgeBaseSync()
+    built_at = (Path(index_path) / INDEX_FILES[0]).stat().st_mtime
+
+    files = sync.local_files(local_dir, pattern)
+    newer = [key for key, path in files.items() if path.stat().st_mtime > built_at]
+    if newer:
+        raise ValueError(
+            f"Index at {index_path} is older than {len(newer)} documents "
+            f"({', '.join(newer[:3])}); rebuild it before writing the manifest"
+        )
+
+    manifest = {
+        "built_at": built_at,
+        "index_fingerprint": index_fingerprint(index_path),
+        "bucket": sync.bucket,
+        "prefix": sync.prefix,
+        "pattern": pattern,
+        "sources": {key[len(sync.prefix) :]: key for key in files},
+        "documents": {
+            key: compute_etag(path, sync.transfer_config) for key, path in files.items()
+        },
+    }
+
+    path = Path(index_path) / MANIFEST_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2))
+
+    logger.info(f"Wrote manifest for {len(manifest['documents'])} documents to {path}")
+    return manifest
+
+
+class ReplicaIndex:
+    """Local FAISS vectorstore built by v1 from the same documents as the KB"""
+
+    def __init__(self, index_path: Optional[str] = None, embeddings=None):
+        self.index_path = Path(index_path or config.REPLICA_INDEX_PATH)
+        self.embeddings = embeddings
+        self.vectorstore = None
+        self.manifest: Dict = {}
+        self._keys_by_name: Dict[str, List[Tuple[str, str]]] = {}
+
+    def load(self) -> bool:
+        manifest_path = self.index_path / MANIFEST_FILE
+        if not manifest_path.exists():
+            logger.warning(f"No replica manifest at {manifest_path}")
+            return False
+
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("index_fingerprint") != index_fingerprint(self.index_path):
+            logger.warning(
+                f"Replica index at {self.index_path} was rebuilt after its "
+                f"manifest was written; run --write-manifest again"
+            )
+            return False
+
+        if self.embeddings is None:
+            self.embeddings = BedrockEmbeddings(
+                client=boto3.client("bedrock-runtime", region_name=config.AWS_REGION),
+                model_id=config.EMBEDDING_MODEL,
+            )
+
+        self.vectorstore = FAISS.load_local(
+            str(self.index_path), self.embeddings, allow_dangerous_deserialization=True
+        )
+        self.manifest = manifest
+        self._keys_by_name = {}
+        for relative, key in manifest.get("sources", {}).items():
+            name = relative.rsplit("/", 1)[-1]
+            self._keys_by_name.setdefault(name, []).append((relative, key))
+        logger.info(
+            f"Loaded replica index from {self.index_path} "
+            f"({len(self.manifest['documents'])} documents)"
+        )
+        return True
+
+    def key_for(self, source: str) -> Optional[str]:
+        """S3 key of the manifest document whose relative path ends `source`"""
+        path = Path(source).as_posix()
+        matches = [
+            (relative, key)
+            for relative, key in self._keys_by_name.get(Path(source).name, [])
+            if path == relative or path.endswith("/" + relative)
+        ]
+        if not matches:
+            return None
+        return max(matches, key=lambda match: len(match[0]))[1]
+
+    def search(self, query: str, k: int) -> List[Tuple[object, float]]:
+        """Return (document, score) pairs, best first.
+
+        FAISS returns L2 distances; score = 1 / (1 + distance) maps them to
+        (0, 1] so thresholds read like the KB's relevance scores.
+        """
+        return [
+            (doc, 1.0 / (1.0 + float(distance)))
+            for doc, distance in self.vectorstore.similarity_search_with_score(
+                query, k=k
+            )
+        ]
+
+
+class TieredRetriever:
+    """Serve retrieval from the local replica, falling back to the knowledge base.
+
+    The replica is used only while its manifest matches the ETags currently
+    in S3 (re-checked every `freshness_ttl` seconds) and its best match
+    scores at least `min_score`. Otherwise, or if the replica search raises,
+    the query goes to `BedrockKBClient.retrieve`. Results use the KB's
+    result format.
+    """
+
+    def __init__(
+        self,
+        replica: Optional[ReplicaIndex] = None,
+        kb_client: Optional[BedrockKBClient] = None,
+        sync: Optional[KnowledgeBaseSync] = None,
+        min_score: float = 0.5,
+        freshness_ttl: float = 300.0,
+    ):
+        self.replica = replica or ReplicaIndex()
+        self.kb_client = kb_client or BedrockKBClient()
+        self.sync = sync or KnowledgeBaseSync()
+        self.min_score = min_score
+        self.freshness_ttl = freshness_ttl
+
+        self._fresh = False
+        self._checked_at: Optional[float] = None
+        self._refreshing = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.counters = {
+            "replica": 0,
+            "stale": 0,
+            "low_confidence": 0,
+            "replica_error": 0,
+        }
+        self.replica_latency = LatencyTracker()
+        self.kb_latency = LatencyTracker()
+
+        if self.replica.vectorstore is None:
+            try:
+                self.replica.load()
+            except Exception as e:
+                logger.warning(f"Replica index not available: {e}")
+
+    def is_fresh(self) -> bool:
+        if self.replica.vectorstore is None:
+            return False
+
+        now = time.time()
+        with self._lock:
+            expired = (
+                self._checked_at is None or now - self._checked_at >= self.freshness_ttl
+            )
+            # One caller refreshes; the others keep using the last result
+            if not expired or self._refreshing:
+                return self._fresh
+            self._refreshing = True
+            generation = self._generation
+
+        manifest = self.replica.manifest
+        try:
+            remote = self.sync.list_remote_etags(manifest.get("pattern", "**/*.pdf"))
+            fresh = remote == manifest.get("documents")
+        except Exception as e:
+            logger.warning(f"Replica freshness check failed: {e}")
+            fresh = False
+
+        with self._lock:
+            self._refreshing = False
+            self._fresh = fresh
+            if generation == self._generation:
+                self._checked_at = now
+
+        if not fresh:
+            logger.info("Replica index is stale, using knowledge base")
+        return fresh
+
+    def invalidate(self):
+        """Force a freshness check on the next query (e.g. after a sync)"""
+        with self._lock:
+            self._checked_at = None
+            self._generation += 1
+
+    def _to_kb_format(self, doc, score: float) -> Dict:
+        source = doc.metadata.get("source", "")
+        key = self.replica.key_for(source) or self.sync.prefix + Path(source).name
+        return {
+            "content": {"text": doc.page_content},
+            "location": {
+                "type": "S3",
+                "s3Location": {"uri": f"s3://{self.sync.bucket}/{key}"},
+            },
+            "score": score,
+            "metadata": dict(doc.metadata),
+        }
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.counters[outcome] += 1
+
+    def retrieve(self, query: str, max_results: int = 5) -> List[Dict]:
+        start_time = time.perf_counter()
+
+        if self.is_fresh():
+            try:
+                results = self.replica.search(query, max_results)
+            except Exception as e:
+                logger.warning(f"Replica search failed, using knowledge base: {e}")
+                self._count("replica_error")
+            else:
+                if results and results[0][1] >= self.min_score:
+                    self.replica_latency.record(time.perf_counter() - start_time)
+                    self._count("replica")
+                    return [self._to_kb_format(doc, score) for doc, score in results]
+                self._count("low_confidence")
+        else:
+            self._count("stale")
+
+        kb_start = time.perf_counter()
+        results = self.kb_client.retrieve(query, max_results=max_results)
+        self.kb_latency.record(time.perf_counter() - kb_start)
+        return results
+
+    def stats(self) -> Dict:
+        total = sum(self.counters.values())
+        replica_ms = self.replica_latency.percentiles()
+        kb_ms = self.kb_latency.percentiles()
+
+        saved_p50 = None
+        if replica_ms["p50"] is not None and kb_ms["p50"] is not None:
+            saved_p50 = round(kb_ms["p50"] - replica_ms["p50"], 1)
+
+        return {
+            "queries": total,
+            "replica_hits": self.counters["replica"],
+            "fallback_stale": self.counters["stale"],
+            "fallback_low_confidence": self.counters["low_confidence"],
+            "fallback_replica_error": self.counters["replica_error"],
+            "hit_rate": round(self.counters["replica"] / total, 3) if total else 0.0,
+            "replica_latency_ms": replica_ms,
+            "kb_latency_ms": kb_ms,
+            "p50_saved_ms": saved_p50,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print("\n" + "=" * 80)
+        print("TIERED RETRIEVAL SUMMARY")
+        print("=" * 80)
+        print(f"Queries: {stats['queries']}")
+        print(
+            f"Replica hits: {stats['replica_hits']} "
+            f"(hit rate {stats['hit_rate']:.1%})"
+        )
+        print(
+            f"Fallbacks: {stats['fallback_stale']} stale, "
+            f"{stats['fallback_low_confidence']} low confidence, "
+            f"{stats['fallback_replica_error']} replica errors"
+        )
+        print(f"Replica latency (ms): {stats['replica_latency_ms']}")
+        print(f"KB latency (ms): {stats['kb_latency_ms']}")
+        print(f"p50 saved per replica hit: {stats['p50_saved_ms']} ms")
+        print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Tiered retrieval: local replica index with KB fallback"
+    )
+    parser.add_argument("--index-path", default=config.REPLICA_INDEX_PATH)
+    parser.add_argument(
+        "--write-manifest",
+        metavar="LOCAL_DIR",
+        help="Record the documents in LOCAL_DIR as the replica's source and exit",
+    )
+    parser.add_argument("--min-score", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.write_manifest:
+        write_manifest(args.index_path, args.write_manifest)
+    else:
+        retriever = TieredRetriever(
+            replica=ReplicaIndex(args.index_path), min_score=args.min_score
+        )
+        questions = [
+            "What are the main products?",
+            "What is the revenue in 2024?",
+            "What are the financial highlights?",
+            "What is the market share?",
+        ]
+        for question in questions:
+            results = retriever.retrieve(question, max_results=config.MAX_RESULTS)
+            print(f"{question} -> {len(results)} results")
+
+        retriever.print_stats()
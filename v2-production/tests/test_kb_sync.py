@@ -0,0 +1,172 @@
+import os
+import sys
+
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+from botocore.stub import Stubber
+from moto import mock_aws
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+from kb_sync import MB, KnowledgeBaseSync, compute_etag, matches_pattern
+
+BUCKET = "test-documents"
+KB_ID = "KB12345678"
+DS_ID = "DS12345678"
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET)
+        yield s3
+
+
+@pytest.fixture
+def agent():
+    client = boto3.client(
+        "bedrock-agent",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    with Stubber(client) as stubber:
+        yield client, stubber
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 first report")
+    (tmp_path / "nested" / "b.pdf").write_bytes(b"%PDF-1.4 second report")
+    (tmp_path / "notes.txt").write_text("not a document")
+    return tmp_path
+
+
+def make_sync(s3, agent_client):
+    sync = KnowledgeBaseSync(
+        s3_client=s3, agent_client=agent_client, bucket=BUCKET, prefix="documents/"
+    )
+    sync.kb_id = KB_ID
+    sync.data_source_id = DS_ID
+    return sync
+
+
+def stub_ingestion(stubber, statuses):
+    ids = {"knowledgeBaseId": KB_ID, "dataSourceId": DS_ID}
+    job = {**ids, "ingestionJobId": "JOB1", "startedAt": 0, "updatedAt": 0}
+
+    stubber.add_response(
+        "start_ingestion_job",
+        {"ingestionJob": {**job, "status": "STARTING"}},
+        ids,
+    )
+    for status in statuses:
+        stubber.add_response(
+            "get_ingestion_job",
+            {
+                "ingestionJob": {
+                    **job,
+                    "status": status,
+                    "statistics": {"numberOfDocumentsScanned": 2},
+                }
+            },
+            {**ids, "ingestionJobId": "JOB1"},
+        )
+
+
+def test_compute_etag_matches_s3(aws, tmp_path):
+    transfer_config = TransferConfig(
+        multipart_threshold=5 * MB, multipart_chunksize=5 * MB
+    )
+    small = tmp_path / "small.pdf"
+    large = tmp_path / "large.pdf"
+    small.write_bytes(b"x" * 1024)
+    large.write_bytes(os.urandom(6 * MB))
+
+    for path in (small, large):
+        aws.upload_file(str(path), BUCKET, path.name, Config=transfer_config)
+        etag = aws.head_object(Bucket=BUCKET, Key=path.name)["ETag"].strip('"')
+        assert compute_etag(path, transfer_config) == etag
+
+    assert compute_etag(large, transfer_config).endswith("-2")
+
+
+def test_sync_uploads_only_changed_files(aws, agent, docs_dir):
+    agent_client, stubber = agent
+    sync = make_sync(aws, agent_client)
+
+    stub_ingestion(stubber, ["IN_PROGRESS", "COMPLETE"])
+    result = sync.sync(str(docs_dir), poll_interval=0)
+
+    assert result["status"] == "success"
+    assert result["uploaded"] == ["documents/a.pdf", "documents/nested/b.pdf"]
+    assert result["ingestion_job"]["status"] == "COMPLETE"
+
+    (docs_dir / "a.pdf").write_bytes(b"%PDF-1.4 first report, revised")
+    stub_ingestion(stubber, ["COMPLETE"])
+    result = sync.sync(str(docs_dir), poll_interval=0)
+
+    assert result["uploaded"] == ["documents/a.pdf"]
+    assert result["unchanged"] == ["documents/nested/b.pdf"]
+    stubber.assert_no_pending_responses()
+
+
+def test_sync_skips_ingestion_when_up_to_date(aws, agent, docs_dir):
+    agent_client, stubber = agent
+    sync = make_sync(aws, agent_client)
+
+    stub_ingestion(stubber, ["COMPLETE"])
+    sync.sync(str(docs_dir), poll_interval=0)
+    result = sync.sync(str(docs_dir), poll_interval=0)
+
+    assert result["status"] == "up_to_date"
+    assert result["uploaded"] == []
+    assert result["ingestion_job"] is None
+    stubber.assert_no_pending_responses()
+
+
+def test_sync_delete_and_dry_run(aws, agent, docs_dir):
+    agent_client, stubber = agent
+    sync = make_sync(aws, agent_client)
+    aws.put_object(Bucket=BUCKET, Key="documents/old.pdf", Body=b"stale")
+
+    result = sync.sync(str(docs_dir), delete=True, dry_run=True)
+
+    assert result["status"] == "dry_run"
+    assert result["deleted"] == ["documents/old.pdf"]
+    assert aws.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 1
+
+    stub_ingestion(stubber, ["FAILED"])
+    result = sync.sync(str(docs_dir), delete=True, poll_interval=0)
+
+    assert result["status"] == "error"
+    keys = [o["Key"] for o in aws.list_objects_v2(Bucket=BUCKET)["Contents"]]
+    assert "documents/old.pdf" not in keys
+
+
+def test_delete_leaves_objects_outside_pattern(aws, agent, docs_dir):
+    agent_client, stubber = agent
+    sync = make_sync(aws, agent_client)
+    aws.put_object(Bucket=BUCKET, Key="documents/old.pdf", Body=b"stale")
+    aws.put_object(Bucket=BUCKET, Key="documents/a.pdf.metadata.json", Body=b"{}")
+
+    stub_ingestion(stubber, ["COMPLETE"])
+    result = sync.sync(str(docs_dir), delete=True, poll_interval=0)
+
+    assert result["deleted"] == ["documents/old.pdf"]
+    keys = [o["Key"] for o in aws.list_objects_v2(Bucket=BUCKET)["Contents"]]
+    assert "documents/a.pdf.metadata.json" in keys
+
+
+def test_matches_pattern_follows_glob():
+    assert matches_pattern("a.pdf", "**/*.pdf")
+    assert matches_pattern("nested/deep/b.pdf", "**/*.pdf")
+    assert not matches_pattern("a.pdf.metadata.json", "**/*.pdf")
+    assert matches_pattern("a.pdf", "*.pdf")
+    assert not matches_pattern("nested/b.pdf", "*.pdf")
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+from metrics import LatencyTracker
+from qa_pipeline import ProductionQASystem
+from server import MicroBatcher, QAServer
+from stub_kb_client import StubKBClient
+
+
+class CountingStubClient(StubKBClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def retrieve_and_generate(self, query):
+        self.calls.append(query)
+        return super().retrieve_and_generate(query)
+
+
+def run_with_client(server, scenario):
+    async def main():
+        async with TestClient(TestServer(server.create_app())) as client:
+            return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def make_server(latency=0.0, **kwargs):
+    stub = CountingStubClient(latency=latency, jitter=0.0, chunk_delay=0.0)
+    return QAServer(qa=ProductionQASystem(client=stub), **kwargs), stub
+
+
+def test_ask_returns_answer():
+    server, _ = make_server()
+
+    async def scenario(client):
+        response = await client.post("/ask", json={"question": "What is NCM?"})
+        return response.status, await response.json()
+
+    status, body = run_with_client(server, scenario)
+
+    assert status == 200
+    assert body["status"] == "success"
+    assert body["answer"] == "Stub answer for: What is NCM?"
+    assert len(body["citations"]) == 1
+
+
+def test_ask_rejects_invalid_body():
+    server, _ = make_server()
+
+    async def scenario(client):
+        missing = await client.post("/ask", json={"q": "x"})
+        not_json = await client.post("/ask", data="not json")
+        return missing.status, not_json.status
+
+    assert run_with_client(server, scenario) == (400, 400)
+
+
+def test_overload_returns_429():
+    server, _ = make_server(
+        latency=0.2, max_queue_size=1, max_batch_size=1, num_workers=1
+    )
+
+    async def scenario(client):
+        responses = await asyncio.gather(
+            *[client.post("/ask", json={"question": f"q{i}"}) for i in range(6)]
+        )
+        metrics = await (await client.get("/metrics")).json()
+        return [r.status for r in responses], responses, metrics
+
+    statuses, responses, metrics = run_with_client(server, scenario)
+
+    assert 200 in statuses
+    assert statuses.count(429) >= 3
+    rejected = next(r for r in responses if r.status == 429)
+    assert rejected.headers["Retry-After"] == "1"
+    assert metrics["requests"]["rejected"] == statuses.count(429)
+
+
+def test_duplicate_questions_are_batched_once():
+    server, stub = make_server(
+        latency=0.05, max_batch_size=8, max_batch_wait=0.05, num_workers=1
+    )
+
+    async def scenario(client):
+        responses = await asyncio.gather(
+            *[client.post("/ask", json={"question": "same"}) for _ in range(5)]
+        )
+        return [r.status for r in responses]
+
+    assert run_with_client(server, scenario) == [200] * 5
+    assert stub.calls == ["same"]
+    assert server.batcher.batches == 1
+
+
+def test_stream_emits_text_then_summary():
+    server, _ = make_server()
+
+    async def scenario(client):
+        response = await client.post("/ask/stream", json={"question": "What is LFP?"})
+        return response.status, response.headers, await response.text()
+
+    status, headers, body = run_with_client(server, scenario)
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/event-stream")
+    assert "".join(e.get("text", "") for e in events).strip() == (
+        "Stub answer for: What is LFP?"
+    )
+    assert events[-1]["status"] == "success"
+    assert len(events[-1]["citations"]) == 1
+
+
+def test_metrics_report_queue_and_latency():
+    server, _ = make_server()
+
+    async def scenario(client):
+        for _ in range(3):
+            await client.post("/ask", json={"question": "What is ESS?"})
+        return await (await client.get("/metrics")).json()
+
+    metrics = run_with_client(server, scenario)
+
+    assert metrics["queue_depth"] == 0
+    assert metrics["requests"]["success"] == 3
+    assert metrics["latency_ms"]["p50"] is not None
+    assert set(metrics["latency_ms"]) == {"p50", "p90", "p99", "max"}
+
+
+def test_expired_questions_fail_fast_with_429():
+    server, stub = make_server(
+        latency=0.3, max_batch_size=1, num_workers=1, max_queue_wait=0.1
+    )
+
+    async def scenario(client):
+        responses = await asyncio.gather(
+            *[client.post("/ask", json={"question": f"q{i}"}) for i in range(3)]
+        )
+        metrics = await (await client.get("/metrics")).json()
+        return sorted(r.status for r in responses), metrics
+
+    statuses, metrics = run_with_client(server, scenario)
+
+    assert statuses == [200, 429, 429]
+    assert len(stub.calls) == 1
+    assert metrics["expired"] == 2
+
+
+def test_abandoned_questions_are_not_dispatched():
+    stub = CountingStubClient(latency=0.0, jitter=0.0)
+    batcher = MicroBatcher(ProductionQASystem(client=stub), num_workers=1)
+
+    async def main():
+        await batcher.start()
+        abandoned = batcher.submit("gone")
+        abandoned.cancel()
+        answered = await batcher.submit("kept")
+        await batcher.stop()
+        return answered
+
+    answered = asyncio.run(main())
+
+    assert answered["status"] == "success"
+    assert stub.calls == ["kept"]
+    assert batcher.abandoned == 1
+
+
+def test_latency_tracker_percentiles():
+    tracker = LatencyTracker()
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+
+    p = tracker.percentiles()
+
+    assert p["p50"] == pytest.approx(51.0)
+    assert p["p99"] == pytest.approx(100.0)
+    assert p["max"] == pytest.approx(100.0)
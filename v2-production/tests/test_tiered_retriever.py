@@ -0,0 +1,263 @@
+import os
+import sys
+import threading
+
+import boto3
+import numpy as np
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from moto import mock_aws
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+from kb_sync import KnowledgeBaseSync
+from qa_pipeline import ProductionQASystem
+from stub_kb_client import StubKBClient
+from tiered_retriever import ReplicaIndex, TieredRetriever, write_manifest
+
+BUCKET = "test-documents"
+VOCAB = ["battery", "revenue", "ncm", "lfp", "plant", "esg"]
+
+
+class KeywordEmbeddings(Embeddings):
+    """Normalized bag-of-words over a tiny vocabulary"""
+
+    def _embed(self, text):
+        words = text.lower().replace("?", "").split()
+        vector = np.array([words.count(w) for w in VOCAB], dtype="float32") + 1e-3
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class CountingStubClient(StubKBClient):
+    def __init__(self):
+        super().__init__(latency=0.01, jitter=0.0)
+        self.queries = []
+
+    def retrieve(self, query, max_results=5):
+        self.queries.append(query)
+        return super().retrieve(query, max_results)
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+    docs_dir = tmp_path / "raw"
+    docs_dir.mkdir()
+    (docs_dir / "2024_report.pdf").write_bytes(b"%PDF-1.4 2024")
+    (docs_dir / "2025_report.pdf").write_bytes(b"%PDF-1.4 2025")
+    (docs_dir / "q1").mkdir()
+    (docs_dir / "q1" / "2025_report.pdf").write_bytes(b"%PDF-1.4 2025 1Q")
+
+    index_path = tmp_path / "replica"
+    embeddings = KeywordEmbeddings()
+    FAISS.from_documents(
+        [
+            Document(
+                page_content="battery revenue", metadata={"source": "2024_report.pdf"}
+            ),
+            Document(
+                page_content="ncm battery", metadata={"source": "2025_report.pdf"}
+            ),
+            Document(
+                page_content="lfp plant",
+                metadata={"source": "data/raw/q1/2025_report.pdf"},
+            ),
+        ],
+        embeddings,
+    ).save_local(str(index_path))
+
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET)
+        sync = KnowledgeBaseSync(
+            s3_client=s3,
+            agent_client=object(),
+            bucket=BUCKET,
+            prefix="documents/",
+        )
+        for key, path in sync.local_files(str(docs_dir)).items():
+            s3.upload_file(str(path), BUCKET, key)
+
+        write_manifest(str(index_path), str(docs_dir), sync=sync)
+        kb = CountingStubClient()
+        retriever = TieredRetriever(
+            replica=ReplicaIndex(str(index_path), embeddings=embeddings),
+            kb_client=kb,
+            sync=sync,
+            min_score=0.6,
+        )
+        yield retriever, kb, s3
+
+
+def test_fresh_replica_serves_confident_queries(env):
+    retriever, kb, _ = env
+
+    results = retriever.retrieve("ncm battery", max_results=1)
+
+    assert kb.queries == []
+    assert results[0]["content"]["text"] == "ncm battery"
+    assert results[0]["location"]["s3Location"]["uri"] == (
+        f"s3://{BUCKET}/documents/2025_report.pdf"
+    )
+    assert retriever.stats()["hit_rate"] == 1.0
+
+
+def test_low_confidence_falls_back_to_kb(env):
+    retriever, kb, _ = env
+
+    retriever.retrieve("esg plant", max_results=2)
+
+    assert kb.queries == ["esg plant"]
+    assert retriever.stats()["fallback_low_confidence"] == 1
+
+
+def test_stale_replica_falls_back_to_kb(env):
+    retriever, kb, s3 = env
+    s3.put_object(Bucket=BUCKET, Key="documents/2025_report.pdf", Body=b"revised")
+    retriever.invalidate()
+
+    retriever.retrieve("ncm battery")
+
+    assert kb.queries == ["ncm battery"]
+    assert retriever.stats()["fallback_stale"] == 1
+
+
+def test_freshness_check_is_cached(env):
+    retriever, kb, s3 = env
+    retriever.retrieve("ncm battery")
+    s3.put_object(Bucket=BUCKET, Key="documents/new.pdf", Body=b"new")
+
+    retriever.retrieve("battery revenue")
+
+    assert kb.queries == []
+    retriever.invalidate()
+    retriever.retrieve("battery revenue")
+    assert kb.queries == ["battery revenue"]
+
+
+def test_stats_report_latency_difference(env):
+    retriever, _, _ = env
+    retriever.retrieve("ncm battery")
+    retriever.retrieve("esg plant")
+
+    stats = retriever.stats()
+
+    assert stats["queries"] == 2
+    assert stats["hit_rate"] == 0.5
+    assert stats["replica_latency_ms"]["p50"] is not None
+    assert stats["kb_latency_ms"]["p50"] is not None
+    assert stats["p50_saved_ms"] == pytest.approx(
+        stats["kb_latency_ms"]["p50"] - stats["replica_latency_ms"]["p50"], abs=0.2
+    )
+
+
+def test_replica_error_falls_back_to_kb(env, monkeypatch):
+    retriever, kb, _ = env
+
+    def broken_search(query, k):
+        raise RuntimeError("index corrupted")
+
+    monkeypatch.setattr(retriever.replica, "search", broken_search)
+
+    results = retriever.retrieve("ncm battery")
+
+    assert kb.queries == ["ncm battery"]
+    assert results
+    assert retriever.stats()["fallback_replica_error"] == 1
+
+
+def test_rebuilt_index_invalidates_manifest(env):
+    retriever, _, _ = env
+    index_path = str(retriever.replica.index_path)
+    FAISS.from_documents(
+        [Document(page_content="lfp plant", metadata={"source": "2025_report.pdf"})],
+        KeywordEmbeddings(),
+    ).save_local(index_path)
+
+    replica = ReplicaIndex(index_path, embeddings=KeywordEmbeddings())
+
+    assert replica.load() is False
+    assert replica.vectorstore is None
+
+
+def test_manifest_refused_for_documents_newer_than_index(env, tmp_path):
+    retriever, _, _ = env
+    index_path = retriever.replica.index_path
+    index_mtime = (index_path / "index.faiss").stat().st_mtime
+    os.utime(tmp_path / "raw" / "2025_report.pdf", (index_mtime + 10,) * 2)
+
+    with pytest.raises(ValueError, match="older than 1 documents"):
+        write_manifest(str(index_path), str(tmp_path / "raw"), sync=retriever.sync)
+
+
+def test_qa_system_generates_from_tiered_results(env):
+    retriever, kb, _ = env
+    qa = ProductionQASystem(client=kb, retriever=retriever)
+
+    result = qa.ask("ncm battery")
+
+    assert result["status"] == "success"
+    assert kb.queries == []
+    references = result["citations"][0]["retrievedReferences"]
+    assert references[0]["content"]["text"] == "ncm battery"
+
+
+def test_nested_source_maps_to_its_s3_key(env):
+    retriever, _, _ = env
+
+    results = retriever.retrieve("lfp plant", max_results=1)
+
+    assert results[0]["location"]["s3Location"]["uri"] == (
+        f"s3://{BUCKET}/documents/q1/2025_report.pdf"
+    )
+
+
+def test_objects_outside_pattern_keep_replica_fresh(env):
+    retriever, kb, s3 = env
+    s3.put_object(
+        Bucket=BUCKET, Key="documents/2025_report.pdf.metadata.json", Body=b"{}"
+    )
+    s3.put_object(Bucket=BUCKET, Key="documents/notes.txt", Body=b"notes")
+    retriever.invalidate()
+
+    retriever.retrieve("ncm battery")
+
+    assert kb.queries == []
+    assert retriever.stats()["replica_hits"] == 1
+
+
+def test_refresh_does_not_block_other_callers(env, monkeypatch):
+    retriever, _, _ = env
+    assert retriever.is_fresh()
+    retriever._checked_at -= retriever.freshness_ttl
+
+    started, release = threading.Event(), threading.Event()
+    list_remote_etags = retriever.sync.list_remote_etags
+
+    def slow_listing(pattern=None):
+        started.set()
+        release.wait(5)
+        return list_remote_etags(pattern)
+
+    monkeypatch.setattr(retriever.sync, "list_remote_etags", slow_listing)
+    refresher = threading.Thread(target=retriever.is_fresh)
+    refresher.start()
+    started.wait(5)
+
+    assert retriever.is_fresh()
+    assert not release.is_set()
+
+    release.set()
+    refresher.join(5)
+    assert retriever._checked_at is not None